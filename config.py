@@ -1,6 +1,7 @@
 import os
 from dataclasses import dataclass
 from typing import Optional
+from urllib.parse import urlparse
 
 # Reference: python-dotenv Documentation
 # https://github.com/theskumar/python-dotenv
@@ -82,11 +83,40 @@ def get_flask_config() -> FlaskConfig:
 	return FlaskConfig(host=host, port=port)
 
 
+@dataclass(frozen=True)
+class SupabaseUrlInfo:
+	"""Connection URL plus a credential-free representation for logging."""
+	url: str
+	safe_url: str
+	host: Optional[str]
+	port: Optional[int]
+
+
 def get_supabase_database_url() -> Optional[str]:
 	url = os.getenv("SUPABASE_DATABASE_URL")
 	return url if url else None
 
 
+def _build_supabase_url_info() -> Optional[SupabaseUrlInfo]:
+	url = get_supabase_database_url()
+	if not url:
+		return None
+	try:
+		parsed = urlparse(url)
+		safe_url = f"{parsed.scheme}://{parsed.hostname}:{parsed.port}/{parsed.path.strip('/')}"
+		return SupabaseUrlInfo(url=url, safe_url=safe_url, host=parsed.hostname, port=parsed.port)
+	except Exception:
+		return SupabaseUrlInfo(url=url, safe_url="supabase (configured)", host=None, port=None)
+
+
+# Parsed once at config-load time so startup logging does not re-run urlparse
+_SUPABASE_URL_INFO: Optional[SupabaseUrlInfo] = _build_supabase_url_info()
+
+
+def get_supabase_url_info() -> Optional[SupabaseUrlInfo]:
+	return _SUPABASE_URL_INFO
+
+
 def get_openai_api_key() -> Optional[str]:
 	key = os.getenv("OPENAI_API_KEY")
 	return key if key else None
@@ -19,12 +19,24 @@ from sqlalchemy.engine import Engine
 # Reference: Python Documentation  - contextlib.contextmanager
 # https://docs.python.org/3/library/contextlib.html#contextlib.contextmanager
 from contextlib import contextmanager
+from functools import lru_cache
 
 from config import get_supabase_database_url
 
 _engine: Optional[Engine] = None
 
 
+@lru_cache(maxsize=256)
+def _text(sql: str):
+	"""Reuse one TextClause per distinct SQL string.
+
+	The app routes issue the same statements on every request; returning a
+	cached clause lets SQLAlchemy's compiled-statement cache hit instead of
+	re-parsing and re-compiling the text each call.
+	"""
+	return text(sql)
+
+
 # Reference: ChatGPT (OpenAI) - SQLAlchemy Engine Initialization
 # Date: 2025-10-15
 # Prompt: "I'm using Supabase PostgreSQL with SQLAlchemy. Can you show me how to set up a connection 
@@ -39,7 +51,14 @@ def init_engine() -> None:
 	url = get_supabase_database_url()
 	if not url:
 		raise RuntimeError("SUPABASE_DATABASE_URL is not configured")
-	_engine = create_engine(url, pool_pre_ping=True)
+	# Keep a pool of warm connections so requests never pay the
+	# TCP+TLS+auth handshake to Supabase; overflow covers bursts.
+	_engine = create_engine(
+		url,
+		pool_size=10,
+		max_overflow=20,
+		pool_pre_ping=True,
+	)
 
 
 # Reference: ChatGPT (OpenAI) - Connection Context Manager Pattern
@@ -67,7 +86,7 @@ def get_conn():
 # https://docs.sqlalchemy.org/en/20/tutorial/data_select.html
 def fetch_all(sql: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
 	with get_conn() as c:
-		res = c.execute(text(sql), params or {})
+		res = c.execute(_text(sql), params or {})
 		rows = [dict(r._mapping) for r in res]
 		return rows
 
@@ -79,7 +98,7 @@ def fetch_all(sql: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[st
 # ChatGPT provided the fetch_one function pattern using fetchone() and dictionary mapping.
 def fetch_one(sql: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
 	with get_conn() as c:
-		res = c.execute(text(sql), params or {})
+		res = c.execute(_text(sql), params or {})
 		row = res.fetchone()
 		return dict(row._mapping) if row else None
 
@@ -93,6 +112,23 @@ def fetch_one(sql: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dic
 # using bindparams() to prevent SQL injection.
 # Reference: SQLAlchemy Documentation  - Transaction Management
 # https://docs.sqlalchemy.org/en/20/core/connections.html#using-transactions
+def execute_many(sql: str, rows: Sequence[Dict[str, Any]]) -> int:
+	"""Run one INSERT/UPDATE/DELETE for a batch of parameter rows.
+
+	SQLAlchemy sends the whole batch as a single executemany, so seeding
+	N rows costs one round-trip instead of N.
+	"""
+	if not rows:
+		return 0
+	if _engine is None:
+		init_engine()
+	assert _engine is not None
+
+	with _engine.begin() as conn:
+		res = conn.execute(_text(sql), list(rows))
+		return res.rowcount or 0
+
+
 def execute(sql: str, params: Optional[Dict[str, Any]] = None) -> int:
 	if _engine is None:
 		init_engine()
@@ -100,9 +136,9 @@ def execute(sql: str, params: Optional[Dict[str, Any]] = None) -> int:
 	
 	with _engine.begin() as conn:
 		if params:
-			stmt = text(sql).bindparams(**params)
+			stmt = _text(sql).bindparams(**params)
 			res = conn.execute(stmt)
 		else:
-			res = conn.execute(text(sql))
+			res = conn.execute(_text(sql))
 		return res.rowcount or 0
 
@@ -1,2 +1,8 @@
+import os
+
 timeout = 120
-workers = 1
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+# Threaded workers let one process overlap many blocking Supabase round-trips
+# instead of serving requests strictly one at a time.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, session, g, send_file, abort
+from flask import Flask, render_template, stream_template, jsonify, request, redirect, url_for, flash, session, g, send_file, abort
 
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 
@@ -12,17 +12,41 @@ import html
 import secrets
 import requests
 import random
+import threading
 from io import BytesIO
 from email.message import EmailMessage
 import smtplib
 from pathlib import Path
 from urllib.parse import urlencode
 from typing import List, Dict, Optional, Tuple, Any
-from datetime import datetime, timedelta, time, timezone
+from datetime import datetime, timedelta, time, timezone, date
+from decimal import Decimal
+
+from cachetools import TTLCache, cached
+
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is much faster than the stdlib json encoder and serialises
+# date/datetime natively, so large payloads (e.g. the calendar events
+# JSON) skip the manual isoformat/strftime loops. Optional: the app
+# still works with the stdlib encoder if orjson is missing.
+try:
+	import orjson
+except Exception:
+	orjson = None
+
+# Flask-Limiter throttles brute-force attempts on the auth endpoints.
+# Optional: the app still starts without it (e.g. local dev installs).
+try:
+	from flask_limiter import Limiter
+	from flask_limiter.util import get_remote_address
+except Exception:
+	Limiter = None
 
 from config import (
 	get_flask_config,
 	get_supabase_database_url,
+	get_supabase_url_info,
 	get_openai_api_key,
 	get_openai_model_name,
 	get_smtp_config,
@@ -34,14 +58,62 @@ from services.analytics import upcoming_tasks_with_priority, assess_progress, no
 SUPABASE_URL = get_supabase_database_url()
 
 
+class AppJSONProvider(DefaultJSONProvider):
+	"""JSON provider that emits ISO-8601 dates and uses orjson when available."""
+
+	@staticmethod
+	def default(o):
+		# ISO-8601 instead of Flask's default RFC 822 dates, so FullCalendar
+		# and other JS consumers can parse them directly.
+		if isinstance(o, (datetime, date)):
+			return o.isoformat()
+		if isinstance(o, Decimal):
+			return float(o)
+		return DefaultJSONProvider.default(o)
+
+	def dumps(self, obj, **kwargs):
+		if orjson is not None:
+			return orjson.dumps(obj, default=self.default, option=orjson.OPT_NAIVE_UTC).decode("utf-8")
+		return super().dumps(obj, **kwargs)
+
+	def loads(self, s, **kwargs):
+		if orjson is not None:
+			return orjson.loads(s)
+		return super().loads(s, **kwargs)
+
+
 app = Flask(__name__, static_folder="static", template_folder="templates")
-app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-only-change-me")
+app.json = AppJSONProvider(app)
+# Session signing key comes from the environment in production. Without it,
+# fall back to 32 random bytes per process (sessions reset on restart and are
+# not shared across workers, so this is only acceptable for local development).
+_secret_key = os.getenv("FLASK_SECRET_KEY")
+if not _secret_key:
+	print("⚠️  FLASK_SECRET_KEY is not set; using a random per-process key (dev only)")
+	_secret_key = secrets.token_bytes(32)
+app.secret_key = _secret_key
 app.config["OPENAI_API_KEY"] = get_openai_api_key()
 app.config["OPENAI_MODEL_NAME"] = get_openai_model_name()
 # During local development, optionally auto-login to speed up testing.
 # Keep disabled by default so production logout/auth works as expected.
 _SKIP_LOGIN_FOR_TESTING = os.getenv("AUTO_LOGIN_FOR_TESTING", "0") in {"1", "true", "True"}
 
+# Rate limiting for the auth endpoints. Uses Redis when RATELIMIT_STORAGE_URI
+# is set (e.g. redis://localhost:6379) so limits are shared across gunicorn
+# workers; falls back to per-process in-memory counters otherwise.
+if Limiter is not None:
+	limiter = Limiter(
+		get_remote_address,
+		app=app,
+		storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
+	)
+	_auth_rate_limit = limiter.limit("10 per minute", methods=["POST"])
+else:
+	limiter = None
+
+	def _auth_rate_limit(view):
+		return view
+
 # Setup follows Flask-Login quickstart guide
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -348,8 +420,16 @@ class User(UserMixin):
 # Required callback function for Flask-Login to load users from session
 @login_manager.user_loader
 def load_user(user_id):
-	"""Load user by ID for Flask-Login"""
-	return User.get(int(user_id))
+	"""Load user by ID for Flask-Login, cached on g for the current request"""
+	# Avoids issuing the students SELECT more than once per request when
+	# the loader is invoked repeatedly (e.g. by helpers outside Flask-Login).
+	cached = g.get("_loaded_user")
+	if cached is not None and str(cached.id) == str(user_id):
+		return cached
+	user = User.get(int(user_id))
+	if user is not None:
+		g._loaded_user = user
+	return user
 
 
 # Custom filter for Irish date format (DD/MM/YYYY)
@@ -410,14 +490,13 @@ def test_database_connection():
 	print("="*70)
 	
 	if SUPABASE_URL:
-		try:
-			from urllib.parse import urlparse
-			parsed = urlparse(SUPABASE_URL)
-			safe_url = f"{parsed.scheme}://{parsed.hostname}:{parsed.port}/{parsed.path.strip('/')}"
+		# URL parsing happens once at config-load time; just print the constants.
+		url_info = get_supabase_url_info()
+		if url_info and url_info.host:
 			print(f"📊 Database: Supabase PostgreSQL")
-			print(f"🌍 Host: {parsed.hostname}")
-			print(f"🔌 Port: {parsed.port}")
-		except:
+			print(f"🌍 Host: {url_info.host}")
+			print(f"🔌 Port: {url_info.port}")
+		else:
 			print(f"📊 Database: Supabase PostgreSQL (configured)")
 		
 		try:
@@ -456,6 +535,7 @@ def test_database_connection():
 
 
 @app.route("/login", methods=["GET", "POST"])
+@_auth_rate_limit
 def login():
 	"""User login page and handler"""
 	if current_user.is_authenticated:
@@ -512,6 +592,7 @@ def login():
 
 
 @app.route("/register", methods=["GET", "POST"])
+@_auth_rate_limit
 def register():
 	"""User registration page and handler"""
 	if current_user.is_authenticated:
@@ -1254,26 +1335,66 @@ def debug_db():
 		return jsonify({"connected": False, "error": str(exc)}), 500
 
 
+def _tasks_next_cursor(rows: List[Dict], page_size: int):
+	"""Trim a fetched page and build the keyset cursor for the next one.
+
+	Returns (page_rows, next_cursor). The query orders NULL due dates
+	last under a far-future sentinel, so the cursor must carry that same
+	sentinel once the page boundary lands in the NULL tail - emitting the
+	raw NULL would make the next request COALESCE back to the minimum
+	date and re-serve page one forever.
+	"""
+	if len(rows) <= page_size:
+		return rows, None
+	rows = rows[:page_size]
+	last_due = rows[-1].get("due_date")
+	if last_due is None:
+		after_due = "9999-12-31"
+	elif hasattr(last_due, "isoformat"):
+		after_due = last_due.isoformat()
+	else:
+		after_due = last_due
+	return rows, {"after_due": after_due, "after_id": rows[-1].get("id")}
+
+
 @app.route("/tasks")
 @login_required
 def tasks():
+	# Keyset pagination: pages follow a (due_date, id) cursor instead of
+	# always materializing up to 200 joined rows. NULL due dates sort last
+	# via a far-future sentinel so the cursor stays strictly increasing.
+	page_size = 50
+	after_due = request.args.get("after_due") or None
+	after_id = request.args.get("after_id", type=int) or 0
 	sql = """
-		SELECT t.id, t.title, t.status, t.due_date, 
+		SELECT t.id, t.title, t.status, t.due_date,
 		       t.canvas_assignment_id, t.canvas_course_id,
-		       s.name AS student_name, 
+		       s.name AS student_name,
 		       m.code AS module_code
 		FROM tasks t
 		JOIN students s ON s.id = t.student_id
 		LEFT JOIN modules m ON m.id = t.module_id
 		WHERE t.student_id = :student_id
-		ORDER BY t.due_date ASC
-		LIMIT 200
+		  AND (COALESCE(t.due_date, DATE '9999-12-31'), t.id)
+		      > (COALESCE(:after_due, DATE '0001-01-01'), :after_id)
+		ORDER BY COALESCE(t.due_date, DATE '9999-12-31') ASC, t.id ASC
+		LIMIT :limit
 	"""
 	try:
-		rows: List[Dict] = sb_fetch_all(sql, {"student_id": current_user.id})
+		rows: List[Dict] = sb_fetch_all(sql, {
+			"student_id": current_user.id,
+			"after_due": after_due,
+			"after_id": after_id,
+			"limit": page_size + 1,
+		})
 	except Exception:
 		rows = []
-	return render_template("tasks.html", tasks=rows)
+
+	rows, next_cursor = _tasks_next_cursor(rows, page_size)
+
+	# stream_template starts sending rendered chunks before the whole page
+	# is built, so time-to-first-byte is no longer tied to full render time
+	return stream_template("tasks.html", tasks=rows, next_cursor=next_cursor)
 
 
 @app.route("/tasks/<int:task_id>/delete", methods=["POST"])
@@ -1303,6 +1424,7 @@ def delete_task(task_id: int):
 		)
 		
 		if result > 0:
+			_invalidate_analytics_cache(current_user.id)
 			flash("Task and all associated subtasks deleted successfully.", "success")
 		else:
 			flash("Task not found or already deleted.", "warning")
@@ -2073,29 +2195,8 @@ def _fetch_lecturer_replies(student_id: int) -> Dict[str, Any]:
 	return result
 
 
-def _build_daily_summary_email(student_id: int) -> Optional[str]:
-	# Reference: ChatGPT (OpenAI) - Daily Summary Grouping
-	# Date: 2026-01-22
-	# Prompt: "Can you help me build a daily summary email that groups tasks into overdue,
-	# due in 24h, and due in 72h?"
-	# ChatGPT provided the grouping and formatting pattern.
-	try:
-		rows = sb_fetch_all(
-			"""
-			SELECT t.id, t.title, t.status, t.due_date, t.due_at,
-			       m.code AS module_code
-			FROM tasks t
-			LEFT JOIN modules m ON m.id = t.module_id
-			WHERE t.student_id = :student_id
-			  AND t.status IN ('pending', 'in_progress')
-			""",
-			{"student_id": student_id}
-		)
-	except Exception as exc:
-		print(f"[daily-summary] failed to load tasks user={student_id} error={exc}")
-		return None
-
-	now = datetime.now(timezone.utc)
+def _format_daily_summary(rows: List[Dict[str, Any]], now: datetime) -> Optional[str]:
+	"""Format one student's open tasks into the daily summary body."""
 	overdue = []
 	due_24h = []
 	due_72h = []
@@ -2132,16 +2233,112 @@ def _build_daily_summary_email(student_id: int) -> Optional[str]:
 	return "\n".join(lines).strip()
 
 
-def _should_send_daily_summary_today(last_sent: Any) -> bool:
+def _build_daily_summary_email(student_id: int) -> Optional[str]:
+	# Reference: ChatGPT (OpenAI) - Daily Summary Grouping
+	# Date: 2026-01-22
+	# Prompt: "Can you help me build a daily summary email that groups tasks into overdue,
+	# due in 24h, and due in 72h?"
+	# ChatGPT provided the grouping and formatting pattern.
+	try:
+		rows = sb_fetch_all(
+			"""
+			SELECT t.id, t.title, t.status, t.due_date, t.due_at,
+			       m.code AS module_code
+			FROM tasks t
+			LEFT JOIN modules m ON m.id = t.module_id
+			WHERE t.student_id = :student_id
+			  AND t.status IN ('pending', 'in_progress')
+			""",
+			{"student_id": student_id}
+		)
+	except Exception as exc:
+		print(f"[daily-summary] failed to load tasks user={student_id} error={exc}")
+		return None
+
+	return _format_daily_summary(rows, datetime.now(timezone.utc))
+
+
+def _build_daily_summary_emails_bulk(student_ids: List[int]) -> Dict[int, str]:
+	"""Build summary bodies for a whole batch with one tasks query.
+
+	Loading every eligible student's open tasks in a single ANY(:ids)
+	query replaces the per-student round-trip the batch loop used to pay.
+	Students with nothing due are simply absent from the result.
+	"""
+	if not student_ids:
+		return {}
+	try:
+		rows = sb_fetch_all(
+			"""
+			SELECT t.student_id, t.id, t.title, t.status, t.due_date, t.due_at,
+			       m.code AS module_code
+			FROM tasks t
+			LEFT JOIN modules m ON m.id = t.module_id
+			WHERE t.student_id = ANY(:ids)
+			  AND t.status IN ('pending', 'in_progress')
+			""",
+			{"ids": list(student_ids)}
+		)
+	except Exception as exc:
+		print(f"[daily-summary] failed to load batch tasks error={exc}")
+		return {}
+
+	tasks_by_student: Dict[int, List[Dict[str, Any]]] = {}
+	for row in rows:
+		tasks_by_student.setdefault(row["student_id"], []).append(row)
+
+	now = datetime.now(timezone.utc)
+	bodies: Dict[int, str] = {}
+	for student_id, student_rows in tasks_by_student.items():
+		body = _format_daily_summary(student_rows, now)
+		if body:
+			bodies[student_id] = body
+	return bodies
+
+
+def _should_send_daily_summary_today(last_sent: Any, today_utc: Optional[date] = None) -> bool:
 	if not last_sent:
 		return True
+	if today_utc is None:
+		today_utc = datetime.now(timezone.utc).date()
 	try:
 		last_date = last_sent.date() if hasattr(last_sent, "date") else None
-		return last_date != datetime.now(timezone.utc).date()
+		return last_date != today_utc
 	except Exception:
 		return True
 
 
+def _flush_daily_summary_statuses(updates: List[Dict[str, Any]]) -> None:
+	"""Write all send outcomes back to students in a single UPDATE.
+
+	One statement with a VALUES list replaces the per-student UPDATE that
+	previously cost a round-trip for every email sent.
+	"""
+	if not updates:
+		return
+	values_sql = []
+	params: Dict[str, Any] = {}
+	for i, row in enumerate(updates):
+		values_sql.append(f"(:id{i}, :status{i}, :err{i})")
+		params[f"id{i}"] = row["student_id"]
+		params[f"status{i}"] = row["status"]
+		params[f"err{i}"] = row["error"]
+	try:
+		sb_execute(
+			f"""
+			UPDATE students AS s
+			SET last_daily_summary_sent_at = CASE WHEN v.status = 'sent' THEN NOW() ELSE s.last_daily_summary_sent_at END,
+			    daily_summary_status = v.status,
+			    daily_summary_error = v.error
+			FROM (VALUES {", ".join(values_sql)}) AS v(id, status, error)
+			WHERE s.id = v.id::int
+			""",
+			params,
+		)
+	except Exception as exc:
+		print(f"[daily-summary] failed to flush send statuses error={exc}")
+
+
 def _run_daily_summary_batch(student_ids: Optional[List[int]] = None, force_send: bool = False) -> Dict[str, int]:
 	stats = {
 		"processed": 0,
@@ -2166,14 +2363,27 @@ def _run_daily_summary_batch(student_ids: Optional[List[int]] = None, force_send
 			if row:
 				rows.append(row)
 	else:
-		rows = sb_fetch_all(
-			"""
+		# Eligibility is filtered in SQL so the batch only transfers students
+		# who can actually receive a summary today, instead of fetching the
+		# whole cohort and discarding rows in Python.
+		sql = """
 			SELECT id, email, email_daily_summary_enabled, last_daily_summary_sent_at
 			FROM students
 			WHERE email IS NOT NULL AND email <> ''
+			  AND COALESCE(email_daily_summary_enabled, TRUE)
+		"""
+		if not force_send:
+			sql += """
+			  AND (last_daily_summary_sent_at IS NULL
+			       OR (last_daily_summary_sent_at AT TIME ZONE 'UTC')::date <> (NOW() AT TIME ZONE 'UTC')::date)
 			"""
-		)
+		rows = sb_fetch_all(sql)
 
+	updates: List[Dict[str, Any]] = []
+	jobs: List[Tuple[int, str, str]] = []
+	# One clock read for the whole batch instead of one per student
+	today_utc = datetime.now(timezone.utc).date()
+	eligible: List[Tuple[int, str]] = []
 	for student in rows:
 		stats["processed"] += 1
 		student_id = student.get("id")
@@ -2184,42 +2394,43 @@ def _run_daily_summary_batch(student_ids: Optional[List[int]] = None, force_send
 		if not bool(student.get("email_daily_summary_enabled", True)):
 			stats["skipped_disabled"] += 1
 			continue
-		if not force_send and not _should_send_daily_summary_today(student.get("last_daily_summary_sent_at")):
+		if not force_send and not _should_send_daily_summary_today(student.get("last_daily_summary_sent_at"), today_utc):
 			stats["skipped_already_sent"] += 1
 			continue
-		body = _build_daily_summary_email(student_id)
+		eligible.append((student_id, email))
+
+	# One grouped query builds every body instead of a query per student
+	bodies = _build_daily_summary_emails_bulk([student_id for student_id, _email in eligible])
+	for student_id, email in eligible:
+		body = bodies.get(student_id)
 		if not body:
 			stats["skipped_empty"] += 1
 			continue
+		jobs.append((student_id, email, body))
+
+	# SMTP latency dominates the batch, so overlap the sends on a thread
+	# pool; each call opens its own SMTP connection, so this is thread-safe.
+	if jobs:
+		from concurrent.futures import ThreadPoolExecutor
+
+		with ThreadPoolExecutor(max_workers=min(16, len(jobs))) as pool:
+			errors = list(pool.map(
+				lambda job: _send_reminder_email(
+					to_email=job[1],
+					subject="Your daily study summary",
+					body=job[2],
+				),
+				jobs,
+			))
+		for (student_id, _email, _body), error in zip(jobs, errors):
+			if error is None:
+				stats["sent"] += 1
+				updates.append({"student_id": student_id, "status": "sent", "error": None})
+			else:
+				stats["failed"] += 1
+				updates.append({"student_id": student_id, "status": "failed", "error": error})
 
-		error = _send_reminder_email(
-			to_email=email,
-			subject="Your daily study summary",
-			body=body,
-		)
-		if error is None:
-			stats["sent"] += 1
-			sb_execute(
-				"""
-				UPDATE students
-				SET last_daily_summary_sent_at = NOW(),
-				    daily_summary_status = 'sent',
-				    daily_summary_error = NULL
-				WHERE id = :student_id
-				""",
-				{"student_id": student_id},
-			)
-		else:
-			stats["failed"] += 1
-			sb_execute(
-				"""
-				UPDATE students
-				SET daily_summary_status = 'failed',
-				    daily_summary_error = :error
-				WHERE id = :student_id
-				""",
-				{"error": error, "student_id": student_id},
-			)
+	_flush_daily_summary_statuses(updates)
 	return stats
 
 
@@ -5513,27 +5724,23 @@ def calendar_view():
 	# end time five minutes later and clamped to the end of the same day. If only a due_date is available, 
 	# the code treats it as an all-day event. This ensures every assignment can be plotted on the calendar, 
 	# even when Canvas only supplies date-level precision.
+	# Native date/datetime objects are passed straight through; the orjson
+	# JSON provider serialises them as ISO-8601 without per-row isoformat calls.
 	events: List[Dict] = []
 	for r in rows:
 		due_at = r.get("due_at")
 		if due_at:
+			start_val = due_at
 			try:
-				start_iso = due_at.isoformat()
+				end_val = due_at + timedelta(minutes=5)
+				end_of_day = due_at.replace(hour=23, minute=59, second=59, microsecond=0)
+				if end_val > end_of_day:
+					end_val = end_of_day
 			except Exception:
-				start_iso = str(due_at)
-			try:
-				from datetime import timedelta
-				start_dt = r.get("due_at")
-				end_dt = start_dt + timedelta(minutes=5)
-				end_of_day = start_dt.replace(hour=23, minute=59, second=59, microsecond=0)
-				if end_dt > end_of_day:
-					end_dt = end_of_day
-				end_iso = end_dt.isoformat()
-			except Exception:
-				end_iso = start_iso
+				end_val = start_val
 		else:
 			due_date = r.get("due_date")
-			start_iso = due_date.strftime("%Y-%m-%d") if hasattr(due_date, "strftime") else str(due_date)
+			start_val = due_date
 			# Reference: ChatGPT (OpenAI) - FullCalendar All-Day End Date (Exclusive)
 			# Date: 2026-02-11
 			# Prompt: "FullCalendar treats all-day event end dates as exclusive. If I set
@@ -5541,10 +5748,9 @@ def calendar_view():
 			# the end date for an all-day deadline so it displays on the correct day?"
 			# ChatGPT recommended using end = start + 1 day for all-day events.
 			try:
-				end_date = due_date + timedelta(days=1)
-				end_iso = end_date.strftime("%Y-%m-%d")
+				end_val = due_date + timedelta(days=1)
 			except Exception:
-				end_iso = start_iso
+				end_val = start_val
 
 		status = r.get("status", "pending")
 		if status == "completed":
@@ -5560,8 +5766,8 @@ def calendar_view():
 		event = {
 			"id": r.get("id"),
 			"title": f"{prefix}{r.get('title')} [{r.get('module_code')}]",
-			"start": start_iso,
-			"end": end_iso,
+			"start": start_val,
+			"end": end_val,
 			"allDay": False if due_at else True,
 			"color": color,
 			"extendedProps": {
@@ -5590,17 +5796,10 @@ def calendar_view():
 		rows_ev = []
 
 	for ev in rows_ev:
+		# FullCalendar requires ISO-8601 date strings for timed events;
+		# the JSON provider handles that for raw datetime values.
 		start_val = ev.get("start_at")
 		end_val = ev.get("end_at")
-		# FullCalendar requires ISO-8601 date strings for timed events
-		try:
-			start_iso = start_val.isoformat()
-		except Exception:
-			start_iso = str(start_val)
-		try:
-			end_iso = end_val.isoformat()
-		except Exception:
-			end_iso = str(end_val)
 		mod = ev.get("module_code")
 		title = ev.get("title")
 		canvas_course_id = ev.get("canvas_course_id")
@@ -5616,8 +5815,8 @@ def calendar_view():
 		events.append({
 			"id": f"event-{ev.get('id')}",
 			"title": f"{prefix}{title} [{mod}]" if mod else f"{prefix}{title}",
-			"start": start_iso,
-			"end": end_iso,
+			"start": start_val,
+			"end": end_val,
 			"allDay": False,
 			"color": color,
 			"extendedProps": {
@@ -6124,70 +6323,107 @@ def toggle_lecture_attendance(event_id: int):
 	return redirect(next_url)
 
 
-@app.route("/analytics")
-@login_required
-def analytics():
-	charts_dir = os.path.join(app.static_folder or "static", "charts")
-	os.makedirs(charts_dir, exist_ok=True)
+# Analytics aggregates change slowly relative to request rate, so the whole
+# computation is cached per student for a short TTL. Writes that change task
+# state call _invalidate_analytics_cache to refresh immediately.
+_ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "30"))
+_analytics_cache_versions: Dict[int, int] = {}
+
 
+def _invalidate_analytics_cache(student_id: int) -> None:
+	_analytics_cache_versions[student_id] = _analytics_cache_versions.get(student_id, 0) + 1
+
+
+@cached(
+	TTLCache(maxsize=256, ttl=_ANALYTICS_CACHE_TTL),
+	key=lambda student_id: (student_id, _analytics_cache_versions.get(student_id, 0)),
+	# cachetools caches are not thread-safe; gthread workers hit this
+	# concurrently and an unsynchronized expiry prune can corrupt the cache
+	lock=threading.Lock(),
+)
+def _compute_analytics(student_id: int) -> Dict[str, Any]:
+	"""Build the analytics dashboard payload for one student."""
 	cutoff_date = datetime.now().date()
 
 	try:
-		status_overview = sb_fetch_all("""
-			SELECT status, COUNT(id) as count
-			FROM tasks
-			WHERE student_id = :student_id
-			  AND (due_date IS NULL OR due_date >= :cutoff_date)
-			GROUP BY status
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
-		
-		# Reference: ChatGPT (OpenAI) - Data Extraction with Generator Expressions
-		# Date: 2025-10-18
-		# Prompt: "I have a list of dictionaries with 'status' and 'count' keys. I need to extract 
-		# counts for specific statuses (completed, in_progress, pending) and default to 0 if not found. 
-		# Can you show me how to use next() with generator expressions and default values?"
-		# ChatGPT provided the pattern using next() with generator expressions to extract values 
-		# from a list of dictionaries, with default values if the status is not found.
-		total_tasks = sum(s['count'] for s in status_overview)
-		completed_tasks = next((s['count'] for s in status_overview if s['status'] == 'completed'), 0)
-		in_progress_tasks = next((s['count'] for s in status_overview if s['status'] == 'in_progress'), 0)
-		pending_tasks = next((s['count'] for s in status_overview if s['status'] == 'pending'), 0)
-		
-		# DATE_TRUNC groups dates by week for weekly analytics
-		weekly_data = sb_fetch_all("""
-			SELECT 
-				DATE_TRUNC('week', completed_at) as week,
-				COUNT(*) as completions
-			FROM tasks
-			WHERE student_id = :student_id 
-			  AND status = 'completed' 
-			  AND completed_at IS NOT NULL
-			  AND (due_date IS NULL OR due_date >= :cutoff_date)
-			GROUP BY DATE_TRUNC('week', completed_at)
-			ORDER BY week
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
-		
-		max_weekly_completions = max((w['completions'] for w in weekly_data), default=1)
-		
-		# Reference: ChatGPT (OpenAI) - Analytics SQL with Conditional Aggregation
-		# Date: 2025-10-18
-		# Prompt: "I need SQL queries for analytics in PostgreSQL. I need to count completed tasks 
-		# that were on-time (completed_at <= due_date) vs late. Can you provide the SQL with proper 
-		# CASE WHEN statements for conditional counting?"
-		# ChatGPT provided the SQL query using CASE WHEN for conditional aggregation to distinguish 
-		# between on-time and late completions.
-		completion_stats = sb_fetch_one("""
-			SELECT 
-				COUNT(*) as total_completed,
-				SUM(CASE WHEN completed_at <= due_date THEN 1 ELSE 0 END) as on_time,
-				SUM(CASE WHEN completed_at > due_date THEN 1 ELSE 0 END) as late
-			FROM tasks 
-			WHERE student_id = :student_id 
-			  AND status = 'completed' 
-			  AND completed_at IS NOT NULL
-			  AND (due_date IS NULL OR due_date >= :cutoff_date)
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
-		
+		# The status overview, weekly completions, on-time stats and module
+		# stats are independent aggregates over the same tasks rows. Running
+		# them as CTEs inside one statement returns everything in a single
+		# Supabase round-trip instead of four sequential ones.
+		combined = sb_fetch_one("""
+			WITH status AS (
+				SELECT
+					COUNT(*) AS total,
+					COUNT(*) FILTER (WHERE status = 'completed') AS completed,
+					COUNT(*) FILTER (WHERE status = 'in_progress') AS in_progress,
+					COUNT(*) FILTER (WHERE status = 'pending') AS pending
+				FROM tasks
+				WHERE student_id = :student_id
+				  AND (due_date IS NULL OR due_date >= :cutoff_date)
+			),
+			weekly AS (
+				SELECT DATE_TRUNC('week', completed_at) AS week,
+				       COUNT(*) AS completions,
+				       MAX(COUNT(*)) OVER () AS max_completions
+				FROM tasks
+				WHERE student_id = :student_id
+				  AND status = 'completed'
+				  AND completed_at IS NOT NULL
+				  AND (due_date IS NULL OR due_date >= :cutoff_date)
+				GROUP BY DATE_TRUNC('week', completed_at)
+			),
+			ctime AS (
+				SELECT
+					COUNT(*) AS total_completed,
+					SUM(CASE WHEN completed_at <= due_date THEN 1 ELSE 0 END) AS on_time,
+					SUM(CASE WHEN completed_at > due_date THEN 1 ELSE 0 END) AS late
+				FROM tasks
+				WHERE student_id = :student_id
+				  AND status = 'completed'
+				  AND completed_at IS NOT NULL
+				  AND (due_date IS NULL OR due_date >= :cutoff_date)
+			),
+			modstats AS (
+				SELECT
+					m.code AS module_code,
+					COUNT(t.id) AS total_tasks,
+					SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END) AS completed,
+					ROUND(
+						(SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END)::numeric / NULLIF(COUNT(t.id), 0)) * 100,
+						1
+					) AS completion_rate
+				FROM modules m
+				LEFT JOIN tasks t ON m.id = t.module_id
+					AND t.student_id = :student_id
+					AND (t.due_date IS NULL OR t.due_date >= :cutoff_date)
+				GROUP BY m.id, m.code
+				HAVING COUNT(t.id) > 0
+			)
+			SELECT json_build_object(
+				'status', (SELECT row_to_json(status.*) FROM status),
+				'weekly', (SELECT COALESCE(json_agg(weekly.* ORDER BY week), '[]'::json) FROM weekly),
+				'completion_stats', (SELECT row_to_json(ctime.*) FROM ctime),
+				'module_stats', (SELECT COALESCE(json_agg(modstats.* ORDER BY completion_rate DESC), '[]'::json) FROM modstats)
+			) AS payload
+		""", {"student_id": student_id, "cutoff_date": cutoff_date})
+		payload = combined["payload"] if combined else {}
+		if isinstance(payload, str):
+			payload = json.loads(payload)
+		status_counts = payload.get("status") or {}
+		weekly_data = payload.get("weekly") or []
+		completion_stats = payload.get("completion_stats") or {"total_completed": 0, "on_time": 0, "late": 0}
+		module_stats = payload.get("module_stats") or []
+
+		# Postgres already pivots the per-status counts via FILTER clauses,
+		# so the totals are plain dict lookups rather than Python-side scans.
+		total_tasks = int(status_counts.get("total") or 0)
+		completed_tasks = int(status_counts.get("completed") or 0)
+		in_progress_tasks = int(status_counts.get("in_progress") or 0)
+		pending_tasks = int(status_counts.get("pending") or 0)
+
+		# The window function already computed the max during aggregation
+		max_weekly_completions = int(weekly_data[0]["max_completions"]) if weekly_data else 1
+
 		if completion_stats and completion_stats['total_completed'] > 0:
 			on_time_percentage = round((completion_stats['on_time'] / completion_stats['total_completed']) * 100, 1)
 			late_percentage = round((completion_stats['late'] / completion_stats['total_completed']) * 100, 1)
@@ -6215,7 +6451,7 @@ def analytics():
 			  AND e.canvas_event_id IS NOT NULL
 			  AND e.start_at <= NOW()
 			""",
-			{"student_id": current_user.id},
+			{"student_id": student_id},
 		) or {"total_lectures": 0, "attended_lectures": 0}
 		total_lectures = int(lecture_overview.get("total_lectures") or 0)
 		attended_lectures = int(lecture_overview.get("attended_lectures") or 0)
@@ -6237,7 +6473,7 @@ def analytics():
 			ORDER BY e.start_at DESC
 			LIMIT 80
 			""",
-			{"student_id": current_user.id},
+			{"student_id": student_id},
 		)
 
 		module_attendance = sb_fetch_all(
@@ -6258,7 +6494,7 @@ def analytics():
 			HAVING COUNT(e.id) > 0
 			ORDER BY m.code
 			""",
-			{"student_id": current_user.id},
+			{"student_id": student_id},
 		)
 		for row in module_attendance:
 			total_for_module = int(row.get("total_lectures") or 0)
@@ -6272,31 +6508,6 @@ def analytics():
 			lecture_attendance_rate=lecture_attendance_rate,
 		)
 		
-		# Reference: ChatGPT (OpenAI) - Module Performance Analytics with NULLIF
-		# Date: 2025-10-18
-		# Prompt: "I need to calculate completion rates per module using LEFT JOIN in PostgreSQL, 
-		# handling division by zero with NULLIF. The query should group by module and only show 
-		# modules that have tasks. Can you provide the SQL with proper NULLIF for safe division?"
-		# ChatGPT provided the SQL query with LEFT JOIN, NULLIF to prevent division by zero, 
-		# and HAVING clause to filter modules with tasks.
-		module_stats = sb_fetch_all("""
-			SELECT 
-				m.code as module_code,
-				COUNT(t.id) as total_tasks,
-				SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END) as completed,
-				ROUND(
-					(SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END)::numeric / NULLIF(COUNT(t.id), 0)) * 100, 
-					1
-				) as completion_rate
-			FROM modules m
-			LEFT JOIN tasks t ON m.id = t.module_id 
-				AND t.student_id = :student_id
-				AND (t.due_date IS NULL OR t.due_date >= :cutoff_date)
-			GROUP BY m.id, m.code
-			HAVING COUNT(t.id) > 0
-			ORDER BY completion_rate DESC
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
-		
 		# 1. Grade Performance Analytics (using Canvas scores)
 		# Note: If canvas_possible is 0 or NULL, treat canvas_score as the percentage directly
 
@@ -6318,7 +6529,7 @@ def analytics():
 			GROUP BY m.id, m.code
 			HAVING COUNT(t.id) > 0
 			ORDER BY avg_percentage DESC NULLS LAST
-		""", {"student_id": current_user.id})
+		""", {"student_id": student_id})
 		
 		# Overall grade stats
 		# Note: If canvas_possible is 0 or NULL, treat canvas_score as the percentage directly
@@ -6333,7 +6544,7 @@ def analytics():
 			FROM tasks 
 			WHERE student_id = :student_id 
 			  AND canvas_score IS NOT NULL
-		""", {"student_id": current_user.id})
+		""", {"student_id": student_id})
 		
 		# Predicted overall grade (weighted by assignment weights)
 
@@ -6360,7 +6571,7 @@ def analytics():
 			  AND canvas_score IS NOT NULL
 			  AND weight_percentage IS NOT NULL
 			  AND weight_percentage > 0
-		""", {"student_id": current_user.id})
+		""", {"student_id": student_id})
 		
 		# Individual graded assignments with scores
 		# Note: If canvas_possible is 0 or NULL, treat canvas_score as the percentage directly
@@ -6384,7 +6595,7 @@ def analytics():
 			WHERE t.student_id = :student_id 
 			  AND t.canvas_score IS NOT NULL
 			ORDER BY t.canvas_graded_at DESC NULLS LAST, t.due_date DESC NULLS LAST
-		""", {"student_id": current_user.id})
+		""", {"student_id": student_id})
 		
 		# 3. Priority & Weighting Analytics
 		# High priority tasks (high weight + due soon)
@@ -6409,7 +6620,7 @@ def analytics():
 				t.due_at ASC NULLS LAST,
 				t.due_date ASC NULLS LAST
 			LIMIT 10
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
+		""", {"student_id": student_id, "cutoff_date": cutoff_date})
 		
 		# Calculate priority scores for high priority tasks
 		from services.analytics import calculate_priority, normalise_due_datetime
@@ -6447,7 +6658,7 @@ def analytics():
 			WHERE student_id = :student_id
 			  AND weight_percentage IS NOT NULL
 			  AND (due_date IS NULL OR due_date >= :cutoff_date)
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
+		""", {"student_id": student_id, "cutoff_date": cutoff_date})
 		
 		# 7. Actionable Insights
 		# Focus module (lowest completion rate)
@@ -6469,7 +6680,7 @@ def analytics():
 			  AND t.due_date <= :cutoff_date + INTERVAL '7 days'
 			ORDER BY t.weight_percentage DESC, t.due_date ASC
 			LIMIT 5
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
+		""", {"student_id": student_id, "cutoff_date": cutoff_date})
 		
 		# Overdue count by module
 		overdue_by_module = sb_fetch_all("""
@@ -6485,7 +6696,7 @@ def analytics():
 			GROUP BY m.id, m.code
 			HAVING COUNT(t.id) > 0
 			ORDER BY overdue_count DESC
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
+		""", {"student_id": student_id, "cutoff_date": cutoff_date})
 		
 		# Calculate predicted grade percentage
 		predicted_grade_pct = None
@@ -6511,7 +6722,7 @@ def analytics():
 			  AND due_date <= :cutoff_date + INTERVAL '30 days'
 			GROUP BY due_date::date
 			ORDER BY day
-		""", {"student_id": current_user.id, "cutoff_date": cutoff_date})
+		""", {"student_id": student_id, "cutoff_date": cutoff_date})
 
 		# Cumulative completed tasks over time
 		cumulative_rows = sb_fetch_all("""
@@ -6524,7 +6735,7 @@ def analytics():
 			  AND completed_at IS NOT NULL
 			GROUP BY completed_at::date
 			ORDER BY day
-		""", {"student_id": current_user.id})
+		""", {"student_id": student_id})
 
 		# Reference: ChatGPT (OpenAI) - Dense Time-Series Chart Preparation
 		# Date: 2026-02-10
@@ -6625,7 +6836,15 @@ def analytics():
 			'health_score': {'score': 0.0, 'label': 'no_data'},
 		}
 
-	return render_template("analytics.html", analytics=analytics_data)
+	return analytics_data
+
+
+@app.route("/analytics")
+@login_required
+def analytics():
+	charts_dir = os.path.join(app.static_folder or "static", "charts")
+	os.makedirs(charts_dir, exist_ok=True)
+	return render_template("analytics.html", analytics=_compute_analytics(current_user.id))
 
 
 # Reference: ChatGPT (OpenAI) - Module-Based Collaborative Study Groups Route
@@ -8594,18 +8813,20 @@ def sync_canvas():
 			return redirect(url_for("sync_canvas"))
 	
 	has_token = current_user.canvas_api_token is not None and current_user.canvas_api_token != ""
-	
-	canvas_tasks_count = sb_fetch_one(
-		"SELECT COUNT(*) as count FROM tasks WHERE student_id = :student_id AND canvas_assignment_id IS NOT NULL",
-		{"student_id": current_user.id}
-	)
-	canvas_tasks = canvas_tasks_count['count'] if canvas_tasks_count else 0
-	
-	total_tasks = sb_fetch_one(
-		"SELECT COUNT(*) as count FROM tasks WHERE student_id = :student_id",
+
+	# One scan of the tasks table instead of two COUNT round-trips; FILTER
+	# lets PostgreSQL produce both totals from the same index range.
+	task_counts = sb_fetch_one(
+		"""
+		SELECT COUNT(*) AS total,
+		       COUNT(*) FILTER (WHERE canvas_assignment_id IS NOT NULL) AS canvas_tasks
+		FROM tasks
+		WHERE student_id = :student_id
+		""",
 		{"student_id": current_user.id}
 	)
-	total = total_tasks['count'] if total_tasks else 0
+	canvas_tasks = task_counts['canvas_tasks'] if task_counts else 0
+	total = task_counts['total'] if task_counts else 0
 	
 	return render_template("sync_canvas.html", 
 	                      has_token=has_token, 
@@ -8613,12 +8834,18 @@ def sync_canvas():
 	                      total_tasks=total)
 
 
+# The module list changes rarely (only when someone adds a module), so a
+# short TTL cache serves most /add-data loads without touching the DB.
+@cached(TTLCache(maxsize=1, ttl=10), lock=threading.Lock())
+def _load_module_options() -> List[Dict[str, Any]]:
+	return sb_fetch_all("SELECT id, code FROM modules ORDER BY code")
+
+
 @app.route("/add-data")
 @login_required
 def add_data_form():
 	"""Display forms for adding modules and tasks"""
-	modules = sb_fetch_all("SELECT id, code FROM modules ORDER BY code")
-	return render_template("add_data.html", modules=modules)
+	return render_template("add_data.html", modules=_load_module_options())
 
 
 # Reference: ChatGPT (OpenAI) - Voice Transcript Parsing for Task Forms
@@ -9499,20 +9726,34 @@ def voice_command():
 @login_required
 def add_module():
 	"""Add a new module to the database"""
+	ok = False
+	code = request.form.get("code", "").strip().upper()
 	try:
-		code = request.form.get("code", "").strip().upper()
 		if not code:
-			flash("Module code is required", "error")
-			return redirect(url_for("add_data_form"))
-		
-		sb_execute(
-			"INSERT INTO modules (code) VALUES (:code)",
-			{"code": code}
-		)
-		flash(f"Module '{code}' added successfully!", "success")
+			message = "Module code is required"
+		else:
+			sb_execute(
+				"INSERT INTO modules (code) VALUES (:code)",
+				{"code": code}
+			)
+			row = sb_fetch_one("SELECT id FROM modules WHERE code = :code", {"code": code})
+			module_id = row["id"] if row else None
+			# Drop the cached dropdown options so the non-JS redirect back
+			# to /add-data lists the new module immediately instead of
+			# after the TTL lapses
+			_load_module_options.cache_clear()
+			ok = True
+			message = f"Module '{code}' added successfully!"
 	except Exception as e:
-		flash(f"Error adding module: {str(e)}", "error")
-	
+		message = f"Error adding module: {str(e)}"
+
+	if _wants_json_response():
+		payload = {"ok": ok, "code": code, "message": message}
+		if ok:
+			payload["module_id"] = module_id
+		return jsonify(payload), (200 if ok else 400)
+
+	flash(message, "success" if ok else "error")
 	return redirect(url_for("add_data_form"))
 
 
@@ -9520,60 +9761,70 @@ def add_module():
 @login_required
 def add_task():
 	"""Add a new task/assignment for the current user"""
-	try:
-		title = request.form.get("title", "").strip()
-		module_id = request.form.get("module_id")
-		due_date = request.form.get("due_date")
-		due_time = request.form.get("due_time")
-		description = request.form.get("description", "").strip() or None
-		weight = request.form.get("weight_percentage")
-		status = request.form.get("status", "pending")
-		
-		if not title:
-			flash("Task title is required", "error")
-			return redirect(url_for("add_data_form"))
-		if not module_id:
-			flash("Please select a module", "error")
-			return redirect(url_for("add_data_form"))
-		if not due_date:
-			flash("Due date is required", "error")
-			return redirect(url_for("add_data_form"))
-		
-		due_at_value = None
-		if due_time:
-			try:
-				dt_combined = datetime.fromisoformat(f"{due_date}T{due_time}")
-				due_at_value = dt_combined
-			except ValueError:
-				flash("Invalid due time provided; saving as all-day deadline.", "warning")
-				due_at_value = None
-		
-		weight_value = None
-		if weight:
-			try:
-				weight_value = float(weight)
-			except ValueError:
-				flash("Weighting must be a number.", "warning")
-				weight_value = None
-		
-		sb_execute(
-			"""INSERT INTO tasks (title, student_id, module_id, due_date, due_at, description, status, weight_percentage) 
-			   VALUES (:title, :student_id, :module_id, :due_date, :due_at, :description, :status, :weight_percentage)""",
-			{
-				"title": title,
-				"student_id": current_user.id,
-				"module_id": int(module_id),
-				"due_date": due_date,
-				"due_at": due_at_value,
-				"description": description,
-				"status": status,
-				"weight_percentage": weight_value
-			}
-		)
-		flash(f"Task '{title}' added successfully!", "success")
-	except Exception as e:
-		flash(f"Error adding task: {str(e)}", "error")
-	
+	ok = False
+	title = request.form.get("title", "").strip()
+	module_id = request.form.get("module_id")
+	due_date = request.form.get("due_date")
+	due_time = request.form.get("due_time")
+	description = request.form.get("description", "").strip() or None
+	weight = request.form.get("weight_percentage")
+	status = request.form.get("status", "pending")
+	# Inputs we save without but want the user to know we discarded
+	warnings: List[str] = []
+
+	if not title:
+		message = "Task title is required"
+	elif not module_id:
+		message = "Please select a module"
+	elif not due_date:
+		message = "Due date is required"
+	else:
+		try:
+			due_at_value = None
+			if due_time:
+				try:
+					due_at_value = datetime.fromisoformat(f"{due_date}T{due_time}")
+				except ValueError:
+					due_at_value = None
+					warnings.append("Invalid due time provided; saving as all-day deadline.")
+
+			weight_value = None
+			if weight:
+				try:
+					weight_value = float(weight)
+				except ValueError:
+					weight_value = None
+					warnings.append("Weighting must be a number.")
+
+			sb_execute(
+				"""INSERT INTO tasks (title, student_id, module_id, due_date, due_at, description, status, weight_percentage)
+				   VALUES (:title, :student_id, :module_id, :due_date, :due_at, :description, :status, :weight_percentage)""",
+				{
+					"title": title,
+					"student_id": current_user.id,
+					"module_id": int(module_id),
+					"due_date": due_date,
+					"due_at": due_at_value,
+					"description": description,
+					"status": status,
+					"weight_percentage": weight_value
+				}
+			)
+			_invalidate_analytics_cache(current_user.id)
+			ok = True
+			message = f"Task '{title}' added successfully!"
+		except Exception as e:
+			message = f"Error adding task: {str(e)}"
+
+	if _wants_json_response():
+		payload = {"ok": ok, "title": title, "message": message}
+		if warnings:
+			payload["warnings"] = warnings
+		return jsonify(payload), (200 if ok else 400)
+
+	flash(message, "success" if ok else "error")
+	for warning in warnings:
+		flash(warning, "warning")
 	return redirect(url_for("add_data_form"))
 
 
@@ -9602,41 +9853,53 @@ def add_lecturer():
 	return redirect(url_for("add_data_form"))
 
 
+def _wants_json_response() -> bool:
+	"""True when the client posted via fetch/XHR and expects JSON back."""
+	if request.headers.get("X-Requested-With") in {"fetch", "XMLHttpRequest"}:
+		return True
+	accept = request.accept_mimetypes
+	return accept["application/json"] > accept["text/html"]
+
+
+_VALID_TASK_STATUSES = frozenset(("pending", "in_progress", "completed"))
+_TASK_OWNERSHIP_SQL = "SELECT id FROM tasks WHERE id = :id AND student_id = :student_id"
+_SET_STATUS_COMPLETED_SQL = """UPDATE tasks
+   SET status = :status, completed_at = NOW()
+   WHERE id = :task_id AND student_id = :student_id"""
+_SET_STATUS_SQL = """UPDATE tasks
+   SET status = :status, completed_at = NULL
+   WHERE id = :task_id AND student_id = :student_id"""
+
+
 @app.route("/update-task-status/<int:task_id>", methods=["POST"])
 @login_required
 def update_task_status(task_id):
 	"""Update the status of a task"""
+	# Fetch submissions get JSON back so the page patches the row in place
+	# instead of paying a redirect + full /tasks re-render per update.
+	ok = False
+	message = "Task status updated successfully!"
+	status = request.form.get("status")
 	try:
-		status = request.form.get("status")
-		if status not in ["pending", "in_progress", "completed"]:
-			flash("Invalid status", "error")
-			return redirect(url_for("tasks"))
-		
-		task = sb_fetch_one("SELECT id FROM tasks WHERE id = :id AND student_id = :student_id", 
-		                    {"id": task_id, "student_id": current_user.id})
-		if not task:
-			flash("Task not found or you don't have permission to update it", "error")
-			return redirect(url_for("tasks"))
-		
-		if status == "completed":
-			sb_execute(
-				"""UPDATE tasks 
-				   SET status = :status, completed_at = NOW() 
-				   WHERE id = :task_id AND student_id = :student_id""",
-				{"status": status, "task_id": task_id, "student_id": current_user.id}
-			)
+		if status not in _VALID_TASK_STATUSES:
+			message = "Invalid status"
 		else:
-			sb_execute(
-				"""UPDATE tasks 
-				   SET status = :status, completed_at = NULL 
-				   WHERE id = :task_id AND student_id = :student_id""",
-				{"status": status, "task_id": task_id, "student_id": current_user.id}
-			)
-		
-		flash("Task status updated successfully!", "success")
+			task = sb_fetch_one(_TASK_OWNERSHIP_SQL,
+			                    {"id": task_id, "student_id": current_user.id})
+			if not task:
+				message = "Task not found or you don't have permission to update it"
+			else:
+				sql = _SET_STATUS_COMPLETED_SQL if status == "completed" else _SET_STATUS_SQL
+				sb_execute(sql, {"status": status, "task_id": task_id, "student_id": current_user.id})
+				_invalidate_analytics_cache(current_user.id)
+				ok = True
 	except Exception as e:
-		flash(f"Error updating task: {str(e)}", "error")
-	
+		message = f"Error updating task: {str(e)}"
+
+	if _wants_json_response():
+		return jsonify({"ok": ok, "task_id": task_id, "status": status, "message": message}), (200 if ok else 400)
+
+	flash(message, "success" if ok else "error")
 	return redirect(url_for("tasks"))
 
 
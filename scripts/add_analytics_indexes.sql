@@ -0,0 +1,20 @@
+-- Composite indexes backing the analytics dashboard queries.
+-- Without them the per-student aggregates in /analytics fall back to
+-- sequential scans of tasks/events once the tables grow.
+
+-- Status pivot + weekly completions both filter on student_id and status
+CREATE INDEX IF NOT EXISTS idx_tasks_student_status ON tasks(student_id, status);
+
+-- Partial index for the completion-time aggregates (on-time/late, weekly,
+-- cumulative): only completed rows with a completion timestamp are scanned
+CREATE INDEX IF NOT EXISTS idx_tasks_completed_partial
+ON tasks(student_id, completed_at)
+WHERE status = 'completed' AND completed_at IS NOT NULL;
+
+-- Module completion-rate rollup joins tasks by module
+CREATE INDEX IF NOT EXISTS idx_tasks_module_status ON tasks(module_id, status);
+
+-- Lecture attendance queries filter Canvas events by student and start time
+CREATE INDEX IF NOT EXISTS idx_events_student_canvas_start
+ON events(student_id, start_at)
+WHERE canvas_event_id IS NOT NULL;
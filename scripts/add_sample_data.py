@@ -11,7 +11,7 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import get_supabase_database_url
-from db_supabase import execute, fetch_all
+from db_supabase import execute_many, fetch_all
 
 def add_sample_data():
     """Add realistic sample data for analytics."""
@@ -30,11 +30,11 @@ def add_sample_data():
             (10, 'Jack Anderson')
         ]
         
-        for student_id, name in students:
-            execute(
-                "INSERT INTO students (id, name) VALUES (:id, :name) ON CONFLICT (id) DO NOTHING",
-                {"id": student_id, "name": name}
-            )
+        # One batched INSERT per table instead of a round-trip per row
+        execute_many(
+            "INSERT INTO students (id, name) VALUES (:id, :name) ON CONFLICT (id) DO NOTHING",
+            [{"id": student_id, "name": name} for student_id, name in students]
+        )
         print("✅ Added students")
         
         # Add more modules
@@ -45,11 +45,10 @@ def add_sample_data():
             (5, 'BIO202')
         ]
         
-        for module_id, code in modules:
-            execute(
-                "INSERT INTO modules (id, code) VALUES (:id, :code) ON CONFLICT (id) DO NOTHING",
-                {"id": module_id, "code": code}
-            )
+        execute_many(
+            "INSERT INTO modules (id, code) VALUES (:id, :code) ON CONFLICT (id) DO NOTHING",
+            [{"id": module_id, "code": code} for module_id, code in modules]
+        )
         print("✅ Added modules")
         
         # Add realistic tasks with varied completion patterns
@@ -99,11 +98,11 @@ def add_sample_data():
             (36, 'Topology exercises', 'completed', '2025-10-23 23:59:59+00', '2025-10-23 10:30:00+00', 2, 2),
         ]
         
-        for task_id, title, status, due_date, completed_at, student_id, module_id in tasks:
-            execute(
-                """INSERT INTO tasks (id, title, status, due_date, completed_at, student_id, module_id) 
-                   VALUES (:id, :title, :status, :due_date, :completed_at, :student_id, :module_id) 
-                   ON CONFLICT (id) DO NOTHING""",
+        execute_many(
+            """INSERT INTO tasks (id, title, status, due_date, completed_at, student_id, module_id)
+               VALUES (:id, :title, :status, :due_date, :completed_at, :student_id, :module_id)
+               ON CONFLICT (id) DO NOTHING""",
+            [
                 {
                     "id": task_id,
                     "title": title,
@@ -113,7 +112,9 @@ def add_sample_data():
                     "student_id": student_id,
                     "module_id": module_id
                 }
-            )
+                for task_id, title, status, due_date, completed_at, student_id, module_id in tasks
+            ]
+        )
         print("✅ Added tasks")
         
         # Verify data
@@ -8,20 +8,14 @@
 
 -- Authentication Migration SQL
 
--- Add authentication fields to students table
-ALTER TABLE students 
-ADD COLUMN IF NOT EXISTS email VARCHAR(255) UNIQUE;
-
-ALTER TABLE students 
-ADD COLUMN IF NOT EXISTS password_hash VARCHAR(255);
-
-ALTER TABLE students 
-ADD COLUMN IF NOT EXISTS canvas_api_token VARCHAR(500);
-
-ALTER TABLE students 
-ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
-
-ALTER TABLE students 
+-- Add authentication fields to students table.
+-- One multi-clause ALTER takes the ACCESS EXCLUSIVE lock once instead of
+-- five times, so the migration holds up concurrent traffic only briefly.
+ALTER TABLE students
+ADD COLUMN IF NOT EXISTS email VARCHAR(255) UNIQUE,
+ADD COLUMN IF NOT EXISTS password_hash VARCHAR(255),
+ADD COLUMN IF NOT EXISTS canvas_api_token VARCHAR(500),
+ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
 ADD COLUMN IF NOT EXISTS last_login TIMESTAMP WITH TIME ZONE;
 
 -- Create index on email for faster login lookups
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Regression check for the /tasks keyset pagination cursor.
+
+Simulates the tasks query over an in-memory dataset of 60 tasks whose
+last 20 have no due date, then pages through it with the real cursor
+builder from main.py. Guards against the bug where a page boundary
+inside the NULL-due tail emitted a NULL cursor, which COALESCEd back to
+the minimum date on the next request and re-served page one forever.
+
+No database needed; run directly: python scripts/check_tasks_pagination.py
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import _tasks_next_cursor
+
+PAGE_SIZE = 50
+MIN_DATE = date(1, 1, 1)
+MAX_DATE = date(9999, 12, 31)
+
+
+def build_tasks():
+    """60 tasks: 40 dated, then a 20-task tail with no due date."""
+    tasks = []
+    for i in range(1, 41):
+        tasks.append({"id": i, "due_date": date(2026, 1, 1) + timedelta(days=i)})
+    for i in range(41, 61):
+        tasks.append({"id": i, "due_date": None})
+    return tasks
+
+
+def fetch_page(tasks, after_due, after_id):
+    """Replicate the query's COALESCE keyset filter, order and limit."""
+    cursor_due = date.fromisoformat(after_due) if after_due else MIN_DATE
+    rows = [
+        t for t in tasks
+        if ((t["due_date"] or MAX_DATE), t["id"]) > (cursor_due, after_id)
+    ]
+    rows.sort(key=lambda t: ((t["due_date"] or MAX_DATE), t["id"]))
+    return rows[:PAGE_SIZE + 1]
+
+
+def check_pagination():
+    tasks = build_tasks()
+    seen = []
+    after_due, after_id = None, 0
+    pages = 0
+    while True:
+        pages += 1
+        assert pages <= 5, "pagination did not terminate (cursor loop)"
+        rows, next_cursor = _tasks_next_cursor(
+            fetch_page(tasks, after_due, after_id), PAGE_SIZE
+        )
+        seen.extend(row["id"] for row in rows)
+        if next_cursor is None:
+            break
+        assert next_cursor["after_due"] is not None, \
+            "cursor emitted NULL after_due for the no-due-date tail"
+        after_due = next_cursor["after_due"]
+        after_id = next_cursor["after_id"]
+
+    assert len(seen) == len(set(seen)), "duplicate rows across pages"
+    assert sorted(seen) == [t["id"] for t in tasks], "rows missing or reordered"
+    print(f"✅ Paged {len(seen)} tasks in {pages} pages with no duplicates")
+
+
+if __name__ == "__main__":
+    check_pagination()
@@ -24,19 +24,12 @@ def clear_all_data():
         return
     
     try:
-        # Delete in order to respect foreign key constraints
-        print("\n🗑️  Deleting tasks...")
-        tasks_deleted = execute("DELETE FROM tasks")
-        print(f"   ✅ Deleted {tasks_deleted} tasks")
-        
-        print("🗑️  Deleting students...")
-        students_deleted = execute("DELETE FROM students")
-        print(f"   ✅ Deleted {students_deleted} students")
-        
-        print("🗑️  Deleting modules...")
-        modules_deleted = execute("DELETE FROM modules")
-        print(f"   ✅ Deleted {modules_deleted} modules")
-        
+        # TRUNCATE is O(1) metadata work instead of per-row DELETE + WAL,
+        # and CASCADE handles the foreign keys so ordering doesn't matter
+        print("\n🗑️  Truncating tasks, students, modules...")
+        execute("TRUNCATE tasks, students, modules RESTART IDENTITY CASCADE")
+        print("   ✅ All rows removed and identity sequences reset")
+
         print("\n✨ Database cleared successfully!")
         print("You can now add data through the web interface at http://127.0.0.1:5001/add-data")
         
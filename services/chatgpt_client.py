@@ -1,11 +1,47 @@
+import asyncio
+import hashlib
+import io
 import json
+import random
+import re
+import threading
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 try:
-	from openai import OpenAI
+	from openai import OpenAI, AsyncOpenAI
 except ImportError:
 	OpenAI = None
+	AsyncOpenAI = None
+
+# Transient errors worth retrying; anything else (auth, bad request)
+# should surface immediately. Kept optional alongside the client import.
+try:
+	from openai import APIConnectionError, RateLimitError
+	_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError)
+except ImportError:
+	_RETRYABLE_ERRORS = ()
+
+try:
+	import httpx
+except ImportError:
+	httpx = None
+
+# orjson parses typical 3-8 KB model responses 2-3x faster than stdlib
+# json; both raise ValueError subclasses on bad input. Same story for
+# dumps, which serialises the batch payloads built below.
+try:
+	from orjson import loads as _json_loads, dumps as _orjson_dumps
+
+	def _json_dumps(obj: Any) -> str:
+		return _orjson_dumps(obj).decode("utf-8")
+except ImportError:
+	_json_loads = json.loads
+	_json_dumps = json.dumps
 
 
 class ChatGPTClientError(Exception):
@@ -54,19 +90,469 @@ class CourseBotResponse:
 	raw_text: str
 
 
-@dataclass
-class AssignmentReviewResponse:
-	feedback: str
-	score_estimate: Optional[float]
-	possible_score: Optional[float]
-	strengths: List[str]
-	weaknesses: List[str]
-	suggestions: List[str]
-	raw_text: str
-
-
 DEFAULT_MODEL_NAME = "gpt-4o-mini"
 
+# Course-bot answers are near-deterministic (temperature=0.2) and source
+# sets rarely change mid-session, so repeat questions can skip the API.
+_COURSEBOT_CACHE_TTL = 600.0  # seconds
+_COURSEBOT_CACHE_MAX = 256
+
+# Recommendations change when tasks/progress change (the prompt embeds
+# both), so identical prompts within an hour can reuse the last answer.
+_RECS_CACHE_TTL = 3600.0  # seconds
+_RECS_CACHE_MAX = 1024
+
+# Smoothing factor for the observed chars-per-token running estimate
+_EMA_BETA = 0.95
+
+# Input-token ceiling for each summary block in a recommendations prompt;
+# months of task history inflate prefill latency and cost without
+# improving the advice, so older lines past this budget are dropped.
+_SUMMARY_TOKEN_BUDGET = 2000
+
+# Retry policy for transient API failures: jittered exponential backoff,
+# capped per-wait at 30s, five attempts total.
+_MAX_API_ATTEMPTS = 5
+
+
+def _retry_wait(attempt: int) -> float:
+	return random.uniform(1.0, min(30.0, 2.0 ** attempt))
+
+# System prompts hoisted to module constants. They are static, so keeping
+# them byte-identical across calls lets OpenAI's server-side prompt caching
+# reuse the tokenized prefix (and saves rebuilding the strings per call).
+_SYSTEM_PROMPT_BREAKDOWN = (
+	"You are an experienced academic coach and study strategist. "
+	"Produce realistic schedules that respect the student's existing commitments. "
+	"Break down assignments into granular, actionable micro-tasks with detailed step-by-step guidance and practical ideas. "
+	"Each micro-task should be comprehensive enough that a student knows exactly what to do, why they're doing it, and has specific ideas to get started."
+)
+
+_SYSTEM_PROMPT_REVIEW = (
+	"You are an experienced academic assessor and writing tutor. "
+	"Review student assignments and provide detailed, constructive feedback. "
+	"Identify specific strengths and weaknesses with concrete examples, and offer actionable suggestions. "
+	"Be thorough, specific, and encouraging. Provide detailed feedback that helps students improve their work."
+)
+
+_SYSTEM_PROMPT_COURSEBOT = (
+	"You are a helpful course assistant. "
+	"Answer questions strictly using the provided source materials. "
+	"If the answer is not clearly supported by the sources, say you cannot find it in the materials. "
+	"Provide concise citations with direct quotes from the sources."
+)
+
+_SYSTEM_PROMPT_EMAIL = (
+	"You are a professional academic writing assistant. "
+	"Draft clear, polite emails to lecturers. Keep them concise and respectful."
+)
+
+# Markdown stripping as three C-level regex passes instead of per-line
+# Python loops with repeated startswith/replace calls.
+_MD_HEADERS = re.compile(r"^\s*#+\s*", re.M)
+_MD_BULLETS = re.compile(r"^\s*[-*•]\s*", re.M)
+_MD_EMPH = re.compile(r"\*\*|__|[*_]")
+# Cheap precheck: the prompts ask for plain text, so most responses carry
+# no markdown at all and can skip the three substitution passes.
+_MD_ANY = re.compile(r"[#*_\-•]")
+
+# One compiled alternation replaces five separate keyword scans (each of
+# which lowercased the question again); named groups identify the mode in
+# a single pass over the string.
+_MODE_RE = re.compile(
+	r"(?P<mcq>mcq|multiple choice|quiz|test me|practice questions)"
+	r"|(?P<flashcard>flashcard)"
+	r"|(?P<truefalse>true[/ ]false|true or false|t/f)"
+	r"|(?P<summary>summary|summari[sz]e|key points)"
+	r"|(?P<argument>counter[- ]?arguments?|main arguments)",
+	re.IGNORECASE,
+)
+
+@lru_cache(maxsize=64)
+def _build_breakdown_user_prompt(
+	today_str: str,
+	task_title: str,
+	module_code: Optional[str],
+	due_date: Optional[str],
+	due_at: Optional[str],
+	status: Optional[str],
+	description: Optional[str],
+	additional_context: Optional[str],
+	schedule_context: Optional[str],
+) -> str:
+	"""Assemble the breakdown user prompt; memoized on all inputs.
+
+	Users tend to click regenerate repeatedly with the same task fields,
+	so the ~25-line string assembly only runs once per distinct input set.
+	"""
+	lines = [
+		f"Today's date is {today_str}. All planned dates MUST be today or later — never in the past.",
+		"Break the assignment into 8-12 practical micro-tasks ordered by sequence.",
+		"Each micro-task should be focused and achievable in 1-3 hours (prefer shorter, more frequent tasks over long sessions).",
+		"Spread tasks evenly across the available days until the due date — do NOT cluster them on consecutive days when the deadline is far away.",
+		"Each micro-task must include:",
+		"  - A detailed description (3-5 sentences) with specific actionable steps explaining what to do and how to approach it",
+		"  - Concrete ideas and suggestions for completing the task (specific resources, methods, or approaches)",
+		"  - A recommended focus tip or strategy",
+		"  - Estimated hours (aim for 1-3 hours per task, with most tasks around 1.5-2 hours)",
+		"  - A suggested start/end window (use plain language such as '2026-03-10 evening' — always include morning, afternoon, or evening)",
+		"Make descriptions comprehensive enough that a student knows exactly what to do, why they're doing it, and has practical ideas to get started.",
+		"Include specific examples, resources to consult, or methods to use in the descriptions.",
+		"Respect the student's existing assignments and events when proposing dates—avoid overlaps.",
+		"Return ONLY JSON in this exact schema:",
+		"{",
+		'  "subtasks": [',
+		'    { "sequence": int, "title": str, "description": str, "estimated_hours": number, '
+		'"planned_start": str, "planned_end": str, "focus": str }',
+		"  ],",
+		'  "advice": str  // include a mini study strategy summary (3-4 sentences)',
+		"}",
+		f"Task title: {task_title}",
+	]
+
+	if module_code:
+		lines.append(f"Module: {module_code}")
+	if status:
+		lines.append(f"Current status: {status}")
+	if due_date:
+		lines.append(f"Due date: {due_date}")
+	if due_at:
+		lines.append(f"Due at: {due_at}")
+	if description:
+		lines.append(f"Assignment brief: {description}")
+	if additional_context:
+		lines.append(f"Additional context: {additional_context}")
+	if schedule_context:
+		lines.append("")
+		lines.append("Student schedule snapshot:")
+		lines.append(schedule_context)
+
+	lines.append("")
+	lines.append(
+		"Ensure the JSON parses in Python. Use concise ISO-like text for planned_start/planned_end (e.g. '2025-11-14 evening'). "
+		"Each description should be 3-5 sentences with actionable steps, specific ideas, resources, or methods. "
+		"Aim for 8-12 subtasks total, each taking 1-3 hours."
+	)
+	return "\n".join(lines)
+
+
+
+def _detect_mode(question: str) -> str:
+	match = _MODE_RE.search(question)
+	return match.lastgroup if match else "default"
+
+
+# Output ceilings sized per mode: a direct answer rarely needs more than a
+# few hundred tokens, and a tight cap shortens provider-side queueing that
+# is reserved against the worst-case response length.
+_MAX_TOKENS_BY_MODE = {
+	"mcq": 2800,
+	"flashcard": 2400,
+	"truefalse": 1500,
+	"summary": 2200,
+	"argument": 2200,
+	"default": 800,
+}
+
+
+def _safe_str(value: Any) -> Optional[str]:
+	# isinstance fast path: model payload values are almost always str
+	# already, so skip the guarded str() conversion for them.
+	if isinstance(value, str):
+		return value.strip()
+	if value is None:
+		return None
+	try:
+		return str(value).strip()
+	except Exception:
+		return None
+
+
+def _make_coursebot_template(header_lines, answer_doc, extra_schema_lines=()):
+	"""Join a course-bot user prompt once at import; only {question} and
+	{sources} are substituted per call (literal braces are escaped)."""
+	return "\n".join([
+		*header_lines,
+		"",
+		"Question: {question}",
+		"",
+		"Sources:",
+		"{sources}",
+		"",
+		"Return ONLY JSON in this exact schema:",
+		*extra_schema_lines,
+		"{{",
+		f'  "answer": str,  // {answer_doc}',
+		'  "citations": [',
+		'    {{ "source": str, "quote": str }}  // Short quotes (<= 200 chars) from sources',
+		"  ]",
+		"}}",
+	])
+
+
+_MCQ_TEMPLATE = _make_coursebot_template((
+	"Use ONLY the sources below to create a short practice quiz.",
+	"Create 10-20 multiple choice questions based on the materials.",
+	"Each question must have 4 options (A-D) and a clearly indicated correct answer.",
+	"Distribute correct answers evenly across A, B, C, and D (avoid repeating the same letter).",
+	"Keep the questions focused on key concepts and definitions from the sources.",
+), "The full MCQ list in plain text")
+
+_FLASHCARD_TEMPLATE = _make_coursebot_template((
+	"Use ONLY the sources below to create flashcards.",
+	"Create exactly 20 flashcards.",
+	"Return 20 bullet points, each on its own line, using this format:",
+	"- Term: <term> | Definition: <definition>",
+	"Keep definitions concise but specific (1-2 sentences).",
+), "Bullet list of flashcards")
+
+_TRUEFALSE_TEMPLATE = _make_coursebot_template((
+	"Use ONLY the sources below to create true/false questions.",
+	"Create exactly 10 questions.",
+	"Each line must include the question, the correct answer, and a brief explanation.",
+	"Format each line like this:",
+	"- Q: <question> | Answer: True/False | Explanation: <1-2 sentences>",
+	"Return plain text lines only. Do NOT return Python lists or JSON arrays inside the answer.",
+), "10-line list of true/false questions")
+
+_SUMMARY_TEMPLATE = _make_coursebot_template((
+	"Use ONLY the sources below to produce a detailed summary.",
+	"Write 10-14 bullet points, each 2-3 sentences long.",
+	"Each bullet must include a specific detail from the sources and avoid vague wording.",
+), "Detailed bullet-point summary grounded in sources")
+
+_ARGUMENT_TEMPLATE = _make_coursebot_template((
+	"Use ONLY the sources below to provide a detailed analysis of arguments and counter-arguments.",
+	"Format the answer with two labeled sections: 'Arguments' and 'Counter-Arguments'.",
+	"Provide 4-6 bullet points per section, each 2-3 sentences long.",
+	"Each bullet must cite a specific detail or claim from the sources.",
+), "Detailed arguments and counter-arguments grounded in sources")
+
+_DEFAULT_TEMPLATE = _make_coursebot_template((
+	"Use ONLY the sources below to answer the question.",
+), "Direct answer grounded in the sources",
+	extra_schema_lines=("Ensure the JSON is valid and do not wrap it in markdown.",))
+
+# Several questions over one shared source set, answered in a single
+# request; element i of the answers array corresponds to question i.
+_MULTI_TEMPLATE = "\n".join([
+	"Use ONLY the sources below to answer each of the following questions.",
+	"",
+	"Questions:",
+	"{questions}",
+	"",
+	"Sources:",
+	"{sources}",
+	"",
+	"Return ONLY JSON in this exact schema:",
+	"{{",
+	'  "answers": [',
+	'    {{',
+	'      "answer": str,  // Direct answer to question i, grounded in the sources',
+	'      "citations": [',
+	'        {{ "source": str, "quote": str }}  // Short quotes (<= 200 chars) from sources',
+	"      ]",
+	"    }}",
+	"  ]",
+	"}}",
+	"The answers array must have exactly one element per question, in the same order.",
+])
+
+# Static recommendations scaffolding joined once at import; per call only
+# the three summary placeholders are substituted.
+_RECS_TEMPLATE = "\n".join([
+	"Analyze the student's current situation and provide personalized study recommendations.",
+	"Focus on:",
+	"  - Task prioritization (which assignments to tackle first)",
+	"  - Time management strategies",
+	"  - Study techniques and approaches",
+	"  - Ways to improve productivity",
+	"",
+	"Return your recommendations as clear, well-structured text (not JSON).",
+	"Do NOT use markdown headings, hashtags, or bold/italic markers.",
+	"Use a numbered list (1., 2., 3., etc.) for easy reading.",
+	"Write 6-8 recommendations, each 2-3 sentences long and specific.",
+	"",
+	"Student's current tasks and workload:",
+	"{tasks_summary}",
+	"",
+	"Progress overview:",
+	"{progress_summary}{schedule_block}",
+])
+
+# Several students' summaries fused into one recommendations request;
+# the model answers with a JSON object keyed by student id.
+_RECS_BATCH_TEMPLATE = "\n".join([
+	"Provide personalized study recommendations for EACH of the students below.",
+	"For every student, write 6-8 numbered recommendations (1., 2., 3., ...),",
+	"each 2-3 sentences long and specific to that student's tasks and progress.",
+	"Do NOT use markdown headings, hashtags, or bold/italic markers.",
+	"",
+	"Students (JSON array):",
+	"{students}",
+	"",
+	"Return ONLY a JSON object mapping each student's id to their",
+	"recommendations text, for example:",
+	'{{ "17": "1. ...", "42": "1. ..." }}',
+])
+
+# Mode -> template lookup; adding a study mode is one regex group, one
+# template, and one entry here.
+_MODE_TEMPLATES = {
+	"mcq": _MCQ_TEMPLATE,
+	"flashcard": _FLASHCARD_TEMPLATE,
+	"truefalse": _TRUEFALSE_TEMPLATE,
+	"summary": _SUMMARY_TEMPLATE,
+	"argument": _ARGUMENT_TEMPLATE,
+	"default": _DEFAULT_TEMPLATE,
+}
+
+_REVIEW_TEMPLATE = "\n".join([
+	"Review the following assignment submission and provide comprehensive, detailed feedback.",
+	"",
+	"Assignment Title: {task_title}",
+	"",
+	"{brief_block}Assignment Content:",
+	"{assignment_text}",
+	"",
+	"Return ONLY JSON in this exact schema:",
+	"{{",
+	'  "feedback": str,  // Overall detailed feedback (7-10 sentences, be specific and thorough)',
+	'  "score_estimate": number,  // Estimated score out of 100 (not displayed to user, but used internally)',
+	'  "possible_score": 100,  // Maximum possible score',
+	'  "strengths": [str, ...],  // List of 5-7 detailed strengths with specific examples',
+	'  "weaknesses": [str, ...],  // List of 5-7 detailed areas for improvement with specific examples',
+	'  "suggestions": [str, ...]  // List of 5-7 detailed, actionable suggestions',
+	"}}",
+])
+
+
+_SYSTEM_PROMPT_RECOMMENDATIONS = (
+	"You are an experienced academic coach and study strategist. "
+	"Provide personalized, actionable study recommendations based on the student's current workload, progress, and schedule. "
+	"Focus on practical advice for task prioritization, time management, and study strategies. "
+	"Be encouraging and specific in your recommendations."
+)
+
+
+def _build_http_client(async_client: bool = False):
+	"""Build one keep-alive HTTP client to share across all OpenAI calls.
+
+	Every endpoint here talks to the same host, so reusing a single pooled
+	connection avoids paying TCP+TLS setup per request. HTTP/2 multiplexes
+	concurrent calls over that one session when the h2 extra is installed.
+	Returns None when httpx is unavailable and the SDK default applies.
+	"""
+	if httpx is None:
+		return None
+	cls = httpx.AsyncClient if async_client else httpx.Client
+	limits = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+	timeout = httpx.Timeout(60.0, connect=5.0)
+	try:
+		return cls(http2=True, limits=limits, timeout=timeout)
+	except ImportError:
+		# http2=True needs the optional h2 package
+		return cls(limits=limits, timeout=timeout)
+
+
+# One OpenAI client (and its pooled transport) per API key per process;
+# re-instantiating the service no longer rebuilds httpx transports and
+# TLS contexts.
+_CLIENT_CACHE: Dict[str, Any] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def _shared_client(api_key: str):
+	with _CLIENT_CACHE_LOCK:
+		client = _CLIENT_CACHE.get(api_key)
+		if client is None:
+			http_client = _build_http_client()
+			if http_client is not None:
+				client = OpenAI(api_key=api_key, http_client=http_client)
+			else:
+				client = OpenAI(api_key=api_key)
+			_CLIENT_CACHE[api_key] = client
+		return client
+
+
+class _TTLCache:
+	"""Small thread-safe dict cache with per-entry expiry.
+
+	Insertion order doubles as age order, so when full the store prunes
+	expired entries first and then drops the oldest survivor.
+	"""
+
+	def __init__(self, maxsize: int, ttl: float):
+		self._maxsize = maxsize
+		self._ttl = ttl
+		self._entries: Dict[str, Any] = {}
+		self._lock = threading.Lock()
+
+	def get(self, key: str) -> Optional[Any]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None or time.monotonic() - entry[0] >= self._ttl:
+				return None
+			return entry[1]
+
+	def set(self, key: str, value: Any) -> None:
+		now = time.monotonic()
+		with self._lock:
+			entries = self._entries
+			if len(entries) >= self._maxsize:
+				cutoff = now - self._ttl
+				for stale in [k for k, entry in entries.items() if entry[0] < cutoff]:
+					del entries[stale]
+				if len(entries) >= self._maxsize:
+					del entries[next(iter(entries))]
+			entries[key] = (now, value)
+
+
+class _RateLimiter:
+	"""Token-bucket pacing for requests/min and tokens/min.
+
+	Waiting before dispatch keeps bulk workloads just under the account
+	ceiling instead of tripping 429s and paying the retry backoff tax.
+	"""
+
+	def __init__(self, max_requests_per_minute: int = 480, max_tokens_per_minute: int = 180_000):
+		self._request_capacity = float(max_requests_per_minute)
+		self._token_capacity = float(max_tokens_per_minute)
+		self._requests = self._request_capacity
+		self._tokens = self._token_capacity
+		self._updated = time.monotonic()
+		self._lock = threading.Lock()
+
+	def try_acquire(self, estimated_tokens: int) -> float:
+		"""Charge the buckets; return 0.0 on success or seconds to wait."""
+		# An estimate above the bucket capacity could never be satisfied,
+		# so acquire would sleep-loop forever. Clamp the charge: a prompt
+		# that big drains the full bucket here and then fails fast at the
+		# API with a real error instead of hanging the worker thread.
+		estimated_tokens = min(float(estimated_tokens), self._token_capacity)
+		with self._lock:
+			now = time.monotonic()
+			elapsed = now - self._updated
+			self._updated = now
+			self._requests = min(self._request_capacity,
+			                     self._requests + elapsed * self._request_capacity / 60.0)
+			self._tokens = min(self._token_capacity,
+			                   self._tokens + elapsed * self._token_capacity / 60.0)
+			if self._requests >= 1.0 and self._tokens >= estimated_tokens:
+				self._requests -= 1.0
+				self._tokens -= estimated_tokens
+				return 0.0
+			request_wait = max(0.0, 1.0 - self._requests) * 60.0 / self._request_capacity
+			token_wait = max(0.0, estimated_tokens - self._tokens) * 60.0 / self._token_capacity
+			return max(request_wait, token_wait, 0.05)
+
+	def acquire(self, estimated_tokens: int) -> None:
+		while True:
+			wait = self.try_acquire(estimated_tokens)
+			if wait <= 0.0:
+				return
+			time.sleep(wait)
+
 
 class ChatGPTTaskBreakdownService:
 	"""Wrapper around OpenAI ChatGPT for producing task micro-plan suggestions."""
@@ -78,10 +564,77 @@ class ChatGPTTaskBreakdownService:
 			raise ChatGPTClientError("openai package is not installed. Run `pip install openai`.")
 
 		self._model_name = model_name or DEFAULT_MODEL_NAME
+		self._api_key = api_key
 		try:
-			self._client = OpenAI(api_key=api_key)
+			self._client = _shared_client(api_key)
 		except Exception as exc:  # pragma: no cover - external dependency
 			raise ChatGPTClientError(f"Failed to initialise OpenAI client: {exc}") from exc
+		self._rate_limiter = _RateLimiter()
+		self._coursebot_cache = _TTLCache(_COURSEBOT_CACHE_MAX, _COURSEBOT_CACHE_TTL)
+		self._recs_cache = _TTLCache(_RECS_CACHE_MAX, _RECS_CACHE_TTL)
+		# prompt hash -> Event; concurrent identical prompts wait on the
+		# first caller's result instead of issuing duplicate API calls
+		self._recs_in_flight: Dict[str, threading.Event] = {}
+		self._recs_in_flight_lock = threading.Lock()
+		# EMA of observed chars-per-token (mean and mean absolute deviation)
+		# seeded at the old static 4.0 guess; refined from response.usage.
+		self._cpt_mean = 4.0
+		self._cpt_dev = 0.0
+		self._cpt_lock = threading.Lock()
+
+	def close(self) -> None:
+		"""Nothing held per-instance needs releasing.
+
+		The sync client is shared process-wide across service instances,
+		so its connections stay open for the next caller, and async
+		clients are scoped to the bulk call (and event loop) that creates
+		them. Kept so existing callers keep working.
+		"""
+
+	def _estimate_tokens(self, system_prompt: str, user_prompt: str, max_output_tokens: int) -> int:
+		# Conservative chars-per-token (mean minus deviation) so the bucket
+		# charges slightly high rather than letting a burst overshoot the
+		# provider ceiling.
+		cpt = max(1.0, self._cpt_mean - self._cpt_dev)
+		return max_output_tokens + int((len(system_prompt) + len(user_prompt)) / cpt)
+
+	def _observe_usage(self, response: Any, prompt_chars: int) -> None:
+		usage = getattr(response, "usage", None)
+		input_tokens = getattr(usage, "input_tokens", None) if usage is not None else None
+		if not input_tokens or prompt_chars <= 0:
+			return
+		observed = prompt_chars / input_tokens
+		with self._cpt_lock:
+			deviation = abs(observed - self._cpt_mean)
+			self._cpt_mean = _EMA_BETA * self._cpt_mean + (1.0 - _EMA_BETA) * observed
+			self._cpt_dev = _EMA_BETA * self._cpt_dev + (1.0 - _EMA_BETA) * deviation
+
+	def _create_response(self, *, system_prompt: str, user_prompt: str,
+	                     temperature: float, max_output_tokens: int) -> Any:
+		self._rate_limiter.acquire(
+			self._estimate_tokens(system_prompt, user_prompt, max_output_tokens)
+		)
+		# Retry only the network call, never the parsing around it; 429s
+		# and connection blips recover after a short jittered backoff while
+		# config errors still fail fast.
+		for attempt in range(1, _MAX_API_ATTEMPTS + 1):
+			try:
+				response = self._client.responses.create(
+					model=self._model_name,
+					input=[
+						{"role": "system", "content": system_prompt},
+						{"role": "user", "content": user_prompt},
+					],
+					temperature=temperature,
+					max_output_tokens=max_output_tokens,
+				)
+				break
+			except _RETRYABLE_ERRORS:
+				if attempt == _MAX_API_ATTEMPTS:
+					raise
+				time.sleep(_retry_wait(attempt))
+		self._observe_usage(response, len(system_prompt) + len(user_prompt))
+		return response
 
 	def breakdown_task(
 		self,
@@ -98,7 +651,10 @@ class ChatGPTTaskBreakdownService:
 		if not task_title:
 			raise ChatGPTClientError("Task title is required for AI breakdown.")
 
-		system_prompt, user_prompt = self._build_prompts(
+		# Exhaust the streaming generator; its return value is the full
+		# parsed response, so the blocking path shares one code path with
+		# streaming callers.
+		gen = self.breakdown_task_stream(
 			task_title=task_title,
 			module_code=module_code,
 			due_date=due_date,
@@ -108,135 +664,234 @@ class ChatGPTTaskBreakdownService:
 			additional_context=additional_context,
 			schedule_context=schedule_context,
 		)
+		while True:
+			try:
+				next(gen)
+			except StopIteration as stop:
+				return stop.value
 
-		response = self._client.responses.create(
-			model=self._model_name,
-			input=[
-				{"role": "system", "content": system_prompt},
-				{"role": "user", "content": user_prompt},
-			],
-			temperature=0.4,
-			max_output_tokens=2500,  #  to support 8-12 detailed subtasks
-		)
-
-		text = self._extract_text(response)
-		payload = self._parse_json(text)
-		items = self._normalise_items(payload.get("subtasks", []))
-		advice = self._safe_str(payload.get("advice"))
-		return BreakdownResponse(subtasks=items, advice=advice, raw_text=text)
-
-	def review_and_grade_assignment(
+	def breakdown_task_stream(
 		self,
 		*,
-		assignment_text: str,
 		task_title: str,
-		assignment_brief: Optional[str] = None
-	) -> AssignmentReviewResponse:
-		# Reference: ChatGPT (OpenAI) - Assignment Review Prompt Design
-		# Date: 2026-01-22
-		# Prompt: "I need a strict JSON schema for assignment feedback, strengths, weaknesses,
-		# and suggestions. Can you help me craft the system/user prompts?"
-		# ChatGPT provided the grading prompt and JSON schema guidance.
+		module_code: Optional[str] = None,
+		due_date: Optional[str] = None,
+		due_at: Optional[str] = None,
+		status: Optional[str] = None,
+		description: Optional[str] = None,
+		additional_context: Optional[str] = None,
+		schedule_context: Optional[str] = None
+	):
+		"""Stream a breakdown, yielding each BreakdownItem as it completes.
+
+		The model spends most of the 2500-token budget generating, so
+		waiting for the whole response before parsing adds seconds of
+		perceived latency. This generator watches the token stream and
+		yields a subtask as soon as its JSON object closes inside the
+		"subtasks" array; the full BreakdownResponse is the generator's
+		return value (available via StopIteration.value).
 		"""
-		Review and grade an assignment draft.
-		Returns feedback, score estimate, strengths, weaknesses, and suggestions.
-		"""
-		system_prompt = (
-			"You are a \"hyper critical\" academic assessor and writing tutor. "
-			"Review student assignments and provide rigorous, detailed feedback. "
-			"Be demanding and identify gaps, weaknesses, and missing evidence with concrete examples. "
-			"Offer actionable, high-standard suggestions for improvement. "
-			"Be thorough and specific, but do not be insulting. "
-			"Apply strict scoring and do not inflate marks; penalize unclear arguments, weak evidence, "
-			"and poor structure more heavily than a typical assessor. "
-			"Use conservative grade bands: <50 poor, 50–59 weak, 60–69 adequate, 70–79 good, "
-			"80–89 excellent (rare), 90+ outstanding (exceptional). "
-			"Scores above 80 should be rare and only when there are virtually no meaningful weaknesses "
-			"and the work shows outstanding evidence, structure, originality, and academic rigor."
+		if not task_title:
+			raise ChatGPTClientError("Task title is required for AI breakdown.")
+
+		system_prompt, user_prompt = self._build_prompts(
+			task_title=task_title,
+			module_code=module_code,
+			due_date=due_date,
+			due_at=due_at,
+			status=status,
+			description=description,
+			additional_context=additional_context,
+			schedule_context=schedule_context,
 		)
 
-		user_prompt_lines = [
-			"Review the following assignment submission and provide comprehensive, detailed feedback.",
-			"",
-			f"Assignment Title: {task_title}",
-			"",
-		]
-
-		if assignment_brief:
-			user_prompt_lines.extend([
-				"Assignment Brief / Rubric / Requirements:",
-				assignment_brief,
-				"",
-			])
-
-		user_prompt_lines.extend([
-			"Assignment Content:",
-			assignment_text,
-			"",
-			"Use a harsh grading standard. Default to lower scores unless the work is exceptional.",
-			"If you list multiple Areas for Improvement, the score should reflect that and stay in a lower band.",
-			"Do NOT reuse or anchor to past scores; judge only the content provided here.",
-			"Return ONLY JSON in this exact schema:",
-			"{",
-			'  "feedback": str,  // Overall detailed feedback (7-10 sentences, be specific and thorough)',
-			'  "score_estimate": number,  // Estimated score out of 100 (not displayed to user, but used internally)',
-			'  "possible_score": 100,  // Maximum possible score',
-			'  "strengths": [str, ...],  // List of 5-7 detailed strengths with specific examples',
-			'  "weaknesses": [str, ...],  // List of 5-7 detailed areas for improvement with specific examples',
-			'  "suggestions": [str, ...]  // List of 5-7 detailed, actionable suggestions',
-			"}",
-		])
+		stream_api = getattr(self._client.responses, "stream", None)
+		if stream_api is None:
+			# Older SDKs without the streaming helper: single blocking call
+			response = self._create_response(
+				system_prompt=system_prompt,
+				user_prompt=user_prompt,
+				temperature=0.4,
+				max_output_tokens=2500,
+			)
+			result = self._breakdown_from_response(response)
+			yield from result.subtasks
+			return result
 
-		user_prompt = "\n".join(user_prompt_lines)
+		self._rate_limiter.acquire(
+			self._estimate_tokens(system_prompt, user_prompt, 2500)
+		)
+		buffer = io.StringIO()
+		emitted = 0
+		for attempt in range(1, _MAX_API_ATTEMPTS + 1):
+			try:
+				with stream_api(
+					model=self._model_name,
+					input=[
+						{"role": "system", "content": system_prompt},
+						{"role": "user", "content": user_prompt},
+					],
+					temperature=0.4,
+					max_output_tokens=2500,  #  to support 8-12 detailed subtasks
+				) as stream:
+					for event in stream:
+						etype = getattr(event, "type", "")
+						if etype == "response.completed":
+							# Final event carries usage; feed the EMA so the
+							# limiter's estimates keep learning when callers
+							# stream instead of block
+							self._observe_usage(
+								getattr(event, "response", None),
+								len(system_prompt) + len(user_prompt),
+							)
+							continue
+						if etype != "response.output_text.delta":
+							continue
+						buffer.write(event.delta)
+						fragments = self._completed_subtask_fragments(buffer.getvalue())
+						for fragment in fragments[emitted:]:
+							emitted += 1
+							try:
+								row = _json_loads(fragment)
+							except ValueError:
+								continue
+							for item in self._normalise_items([row]):
+								yield item
+				break
+			except _RETRYABLE_ERRORS:
+				# Retry only while nothing has reached the caller; once
+				# subtasks have been yielded a restart would duplicate them.
+				if emitted or attempt == _MAX_API_ATTEMPTS:
+					raise
+				buffer = io.StringIO()
+				time.sleep(_retry_wait(attempt))
+
+		text = buffer.getvalue()
+		payload = self._parse_json(text)
+		items = self._normalise_items(payload.get("subtasks", []))
+		advice = self._safe_str(payload.get("advice"))
+		return BreakdownResponse(subtasks=items, advice=advice, raw_text=text)
 
-		try:
-			response = self._client.responses.create(
-				model=self._model_name,
-				input=[
-					{"role": "system", "content": system_prompt},
-					{"role": "user", "content": user_prompt},
-				],
-				temperature=0.0,
-				max_output_tokens=3000,
-			)
+	def _completed_subtask_fragments(self, text: str) -> List[str]:
+		"""Return the balanced JSON objects so far inside the subtasks array.
 
-			text = self._extract_text(response)
-			payload = self._parse_json(text)
+		Same string-aware brace tracking as _extract_json_fragment, scoped
+		to the array so streamed partial output never triggers a full parse.
+		"""
+		marker = text.find('"subtasks"')
+		if marker == -1:
+			return []
+		start = text.find("[", marker)
+		if start == -1:
+			return []
+		fragments: List[str] = []
+		depth = 0
+		in_string = False
+		escape = False
+		obj_start = -1
+		for i in range(start + 1, len(text)):
+			ch = text[i]
+			if in_string:
+				if escape:
+					escape = False
+				elif ch == "\\":
+					escape = True
+				elif ch == '"':
+					in_string = False
+				continue
+			if ch == '"':
+				in_string = True
+			elif ch == "{":
+				if depth == 0:
+					obj_start = i
+				depth += 1
+			elif ch == "}":
+				depth -= 1
+				if depth == 0 and obj_start != -1:
+					fragments.append(text[obj_start:i + 1])
+					obj_start = -1
+			elif ch == "]" and depth == 0:
+				break
+		return fragments
+
+	def _breakdown_from_response(self, response: Any) -> BreakdownResponse:
+		text = self._extract_text(response)
+		payload = self._parse_json(text)
+		items = self._normalise_items(payload.get("subtasks", []))
+		advice = self._safe_str(payload.get("advice"))
+		return BreakdownResponse(subtasks=items, advice=advice, raw_text=text)
 
-			feedback = self._safe_str(payload.get("feedback")) or "No feedback provided."
-			score_est = payload.get("score_estimate")
-			if isinstance(score_est, (int, float)):
-				score_est = float(score_est)
-			elif isinstance(score_est, str):
-				try:
-					score_est = float(score_est)
-				except ValueError:
-					score_est = None
-			else:
-				score_est = None
+	@asynccontextmanager
+	async def _async_client_scope(self):
+		"""Yield an AsyncOpenAI client bound to the current event loop.
 
-			possible = payload.get("possible_score") or 100.0
-			if isinstance(possible, (int, float)):
-				possible = float(possible)
+		Each bulk entry point runs inside its own asyncio.run loop, and
+		keep-alive connections opened in one loop cannot be awaited from
+		the next (RuntimeError: Event loop is closed). The client and its
+		HTTP pool therefore live and die inside the loop that uses them
+		rather than being cached on the service; within one bulk call the
+		pooled connections are still shared across the whole gather.
+		"""
+		if AsyncOpenAI is None:
+			raise ChatGPTClientError("openai package is not installed. Run `pip install openai`.")
+		try:
+			http_client = _build_http_client(async_client=True)
+			if http_client is not None:
+				client = AsyncOpenAI(api_key=self._api_key, http_client=http_client)
 			else:
-				possible = 100.0
-
-			strengths = [self._safe_str(s) for s in payload.get("strengths", []) if self._safe_str(s)]
-			weaknesses = [self._safe_str(w) for w in payload.get("weaknesses", []) if self._safe_str(w)]
-			suggestions = [self._safe_str(s) for s in payload.get("suggestions", []) if self._safe_str(s)]
+				client = AsyncOpenAI(api_key=self._api_key)
+		except Exception as exc:  # pragma: no cover - external dependency
+			raise ChatGPTClientError(f"Failed to initialise OpenAI client: {exc}") from exc
+		try:
+			yield client
+		finally:
+			await client.close()
+			if http_client is not None:
+				await http_client.aclose()
+
+	async def _breakdown_task_async(self, client, **task_fields: Any) -> BreakdownResponse:
+		if not task_fields.get("task_title"):
+			raise ChatGPTClientError("Task title is required for AI breakdown.")
+		system_prompt, user_prompt = self._build_prompts(**task_fields)
+		estimated = self._estimate_tokens(system_prompt, user_prompt, 2500)
+		while (wait := self._rate_limiter.try_acquire(estimated)) > 0.0:
+			await asyncio.sleep(wait)
+		for attempt in range(1, _MAX_API_ATTEMPTS + 1):
+			try:
+				response = await client.responses.create(
+					model=self._model_name,
+					input=[
+						{"role": "system", "content": system_prompt},
+						{"role": "user", "content": user_prompt},
+					],
+					temperature=0.4,
+					max_output_tokens=2500,
+				)
+				break
+			except _RETRYABLE_ERRORS:
+				if attempt == _MAX_API_ATTEMPTS:
+					raise
+				await asyncio.sleep(_retry_wait(attempt))
+		self._observe_usage(response, len(system_prompt) + len(user_prompt))
+		return self._breakdown_from_response(response)
+
+	def breakdown_tasks_bulk(self, items: List[Dict[str, Any]]) -> List[BreakdownResponse]:
+		"""Break down several tasks concurrently; results keep input order.
+
+		Each item is the keyword dict breakdown_task accepts. The work is
+		pure HTTP latency, so dispatching all requests with asyncio.gather
+		collapses N sequential round-trips into roughly one.
+		"""
+		if not items:
+			return []
 
+		async def _run() -> List[BreakdownResponse]:
+			async with self._async_client_scope() as client:
+				return list(await asyncio.gather(
+					*(self._breakdown_task_async(client, **item) for item in items)
+				))
 
-			return AssignmentReviewResponse(
-				feedback=feedback,
-				score_estimate=score_est,
-				possible_score=possible,
-				strengths=strengths,
-				weaknesses=weaknesses,
-				suggestions=suggestions,
-				raw_text=text
-			)
-		except Exception as exc:
-			raise ChatGPTClientError(f"Failed to review assignment: {exc}") from exc
+		return asyncio.run(_run())
 
 	def answer_course_question(
 		self,
@@ -254,170 +909,30 @@ class ChatGPTTaskBreakdownService:
 		if not sources:
 			raise ChatGPTClientError("No course materials were provided.")
 
-		system_prompt = (
-			"You are a helpful course assistant. "
-			"Answer questions strictly using the provided source materials. "
-			"If the answer is not clearly supported by the sources, say you cannot find it in the materials. "
-			"Provide concise citations with direct quotes from the sources."
-		)
+		cache_key = self._coursebot_cache_key(question, sources)
+		hit = self._coursebot_cache.get(cache_key)
+		if hit is not None:
+			return hit
 
-		mcq_mode = any(
-			keyword in question.lower()
-			for keyword in ("mcq", "multiple choice", "quiz", "test me", "practice questions")
-		)
-		summary_mode = any(
-			keyword in question.lower()
-			for keyword in ("summary", "summarise", "summarize", "key points")
-		)
-		argument_mode = any(
-			keyword in question.lower()
-			for keyword in ("counter-argument", "counter argument", "counterarguments", "counter arguments", "main arguments")
-		)
-		flashcard_mode = "flashcard" in question.lower()
-		true_false_mode = any(
-			keyword in question.lower()
-			for keyword in ("true/false", "true or false", "true false", "t/f")
+		system_prompt = _SYSTEM_PROMPT_COURSEBOT
+
+		mode = _detect_mode(question)
+
+		# One pass over the sources; the per-mode scaffolding is a module
+		# constant, so only the two placeholders are formatted per call.
+		sources_str = "\n\n".join(
+			f"Source: {item.get('source') or 'Unknown Source'}\nContent:\n{item.get('content') or ''}"
+			for item in sources
 		)
 
-		source_blocks = []
-		for item in sources:
-			source_name = item.get("source") or "Unknown Source"
-			content = item.get("content") or ""
-			source_blocks.append(f"Source: {source_name}\nContent:\n{content}")
-
-		if mcq_mode:
-			user_prompt_lines = [
-				"Use ONLY the sources below to create a short practice quiz.",
-				"Create 10-20 multiple choice questions based on the materials.",
-				"Each question must have 4 options (A-D) and a clearly indicated correct answer.",
-				"Distribute correct answers evenly across A, B, C, and D (avoid repeating the same letter).",
-				"Keep the questions focused on key concepts and definitions from the sources.",
-				"",
-				f"Question: {question}",
-				"",
-				"Sources:",
-				"\n\n".join(source_blocks),
-				"",
-				"Return ONLY JSON in this exact schema:",
-				"{",
-				'  "answer": str,  // The full MCQ list in plain text',
-				'  "citations": [',
-				'    { "source": str, "quote": str }  // Short quotes (<= 200 chars) from sources',
-				"  ]",
-				"}",
-			]
-		elif flashcard_mode:
-			user_prompt_lines = [
-				"Use ONLY the sources below to create flashcards.",
-				"Create exactly 20 flashcards.",
-				"Return 20 bullet points, each on its own line, using this format:",
-				"- Term: <term> | Definition: <definition>",
-				"Keep definitions concise but specific (1-2 sentences).",
-				"",
-				f"Question: {question}",
-				"",
-				"Sources:",
-				"\n\n".join(source_blocks),
-				"",
-				"Return ONLY JSON in this exact schema:",
-				"{",
-				'  "answer": str,  // Bullet list of flashcards',
-				'  "citations": [',
-				'    { "source": str, "quote": str }  // Short quotes (<= 200 chars) from sources',
-				"  ]",
-				"}",
-			]
-		elif true_false_mode:
-			user_prompt_lines = [
-				"Use ONLY the sources below to create true/false questions.",
-				"Create exactly 10 questions.",
-				"Each line must include the question, the correct answer, and a brief explanation.",
-				"Format each line like this:",
-				"- Q: <question> | Answer: True/False | Explanation: <1-2 sentences>",
-				"Return plain text lines only. Do NOT return Python lists or JSON arrays inside the answer.",
-				"",
-				f"Question: {question}",
-				"",
-				"Sources:",
-				"\n\n".join(source_blocks),
-				"",
-				"Return ONLY JSON in this exact schema:",
-				"{",
-				'  "answer": str,  // 10-line list of true/false questions',
-				'  "citations": [',
-				'    { "source": str, "quote": str }  // Short quotes (<= 200 chars) from sources',
-				"  ]",
-				"}",
-			]
-		elif summary_mode:
-			user_prompt_lines = [
-				"Use ONLY the sources below to produce a detailed summary.",
-				"Write 10-14 bullet points, each 2-3 sentences long.",
-				"Each bullet must include a specific detail from the sources and avoid vague wording.",
-				"",
-				f"Question: {question}",
-				"",
-				"Sources:",
-				"\n\n".join(source_blocks),
-				"",
-				"Return ONLY JSON in this exact schema:",
-				"{",
-				'  "answer": str,  // Detailed bullet-point summary grounded in sources',
-				'  "citations": [',
-				'    { "source": str, "quote": str }  // Short quotes (<= 200 chars) from sources',
-				"  ]",
-				"}",
-			]
-		elif argument_mode:
-			user_prompt_lines = [
-				"Use ONLY the sources below to provide a detailed analysis of arguments and counter-arguments.",
-				"Format the answer with two labeled sections: 'Arguments' and 'Counter-Arguments'.",
-				"Provide 4-6 bullet points per section, each 2-3 sentences long.",
-				"Each bullet must cite a specific detail or claim from the sources.",
-				"",
-				f"Question: {question}",
-				"",
-				"Sources:",
-				"\n\n".join(source_blocks),
-				"",
-				"Return ONLY JSON in this exact schema:",
-				"{",
-				'  "answer": str,  // Detailed arguments and counter-arguments grounded in sources',
-				'  "citations": [',
-				'    { "source": str, "quote": str }  // Short quotes (<= 200 chars) from sources',
-				"  ]",
-				"}",
-			]
-		else:
-			user_prompt_lines = [
-				"Use ONLY the sources below to answer the question.",
-				"",
-				f"Question: {question}",
-				"",
-				"Sources:",
-				"\n\n".join(source_blocks),
-				"",
-				"Return ONLY JSON in this exact schema:",
-				"Ensure the JSON is valid and do not wrap it in markdown.",
-				"{",
-				'  "answer": str,  // Direct answer grounded in the sources',
-				'  "citations": [',
-				'    { "source": str, "quote": str }  // Short quotes (<= 200 chars) from sources',
-				"  ]",
-				"}",
-			]
-
-		user_prompt = "\n".join(user_prompt_lines)
+		user_prompt = _MODE_TEMPLATES[mode].format(question=question, sources=sources_str)
 
 		try:
-			response = self._client.responses.create(
-				model=self._model_name,
-				input=[
-					{"role": "system", "content": system_prompt},
-					{"role": "user", "content": user_prompt},
-				],
+			response = self._create_response(
+				system_prompt=system_prompt,
+				user_prompt=user_prompt,
 				temperature=0.2,
-				max_output_tokens=2800,
+				max_output_tokens=_MAX_TOKENS_BY_MODE[mode],
 			)
 
 			text = self._extract_text(response)
@@ -425,23 +940,90 @@ class ChatGPTTaskBreakdownService:
 				payload = self._parse_json(text)
 			except ChatGPTClientError:
 				# Fall back to raw text if JSON is not returned
-				return CourseBotResponse(answer=text.strip(), citations=[], raw_text=text)
-
-			answer = self._safe_str(payload.get("answer")) or "I could not find an answer in the provided materials."
-			raw_citations = payload.get("citations", []) or []
-			citations: List[CourseBotCitation] = []
-			if isinstance(raw_citations, list):
-				for entry in raw_citations:
-					if not isinstance(entry, dict):
-						continue
-					source = self._safe_str(entry.get("source")) or "Unknown Source"
-					quote = self._safe_str(entry.get("quote")) or ""
-					citations.append(CourseBotCitation(source=source, quote=quote))
-
-			return CourseBotResponse(answer=answer, citations=citations, raw_text=text)
+				result = CourseBotResponse(answer=text.strip(), citations=[], raw_text=text)
+				self._coursebot_cache.set(cache_key, result)
+				return result
+
+			result = self._coursebot_from_payload(payload, text)
+			self._coursebot_cache.set(cache_key, result)
+			return result
 		except Exception as exc:
 			raise ChatGPTClientError(f"Failed to answer course question: {exc}") from exc
 
+	def _coursebot_from_payload(self, payload: Dict[str, Any], raw_text: str) -> CourseBotResponse:
+		answer = self._safe_str(payload.get("answer")) or "I could not find an answer in the provided materials."
+		raw_citations = payload.get("citations", []) or []
+		citations: List[CourseBotCitation] = []
+		if isinstance(raw_citations, list):
+			for entry in raw_citations:
+				if not isinstance(entry, dict):
+					continue
+				source = self._safe_str(entry.get("source")) or "Unknown Source"
+				quote = self._safe_str(entry.get("quote")) or ""
+				citations.append(CourseBotCitation(source=source, quote=quote))
+		return CourseBotResponse(answer=answer, citations=citations, raw_text=raw_text)
+
+	def answer_course_questions_multi(
+		self,
+		*,
+		questions: List[str],
+		sources: List[Dict[str, str]]
+	) -> List[CourseBotResponse]:
+		"""Answer several questions over the same sources in one request.
+
+		Fusing the questions sends the (often large) source material and
+		system prompt once instead of once per question, and consumes a
+		single rate-limit slot. Results keep the order of the questions.
+		"""
+		questions = [q for q in questions if q]
+		if not questions:
+			raise ChatGPTClientError("Question is required.")
+		if not sources:
+			raise ChatGPTClientError("No course materials were provided.")
+		if len(questions) == 1:
+			return [self.answer_course_question(question=questions[0], sources=sources)]
+
+		sources_str = "\n\n".join(
+			f"Source: {item.get('source') or 'Unknown Source'}\nContent:\n{item.get('content') or ''}"
+			for item in sources
+		)
+		numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, start=1))
+		user_prompt = _MULTI_TEMPLATE.format(questions=numbered, sources=sources_str)
+
+		try:
+			response = self._create_response(
+				system_prompt=_SYSTEM_PROMPT_COURSEBOT,
+				user_prompt=user_prompt,
+				temperature=0.2,
+				max_output_tokens=min(3200, 800 * len(questions)),
+			)
+
+			text = self._extract_text(response)
+			payload = self._parse_json(text)
+			entries = payload.get("answers") if isinstance(payload, dict) else payload
+			if not isinstance(entries, list):
+				raise ChatGPTClientError("OpenAI response did not contain an answer list.")
+
+			results: List[CourseBotResponse] = []
+			for index in range(len(questions)):
+				entry = entries[index] if index < len(entries) and isinstance(entries[index], dict) else {}
+				results.append(self._coursebot_from_payload(entry, text))
+			return results
+		except ChatGPTClientError:
+			raise
+		except Exception as exc:
+			raise ChatGPTClientError(f"Failed to answer course questions: {exc}") from exc
+
+	def _coursebot_cache_key(self, question: str, sources: List[Dict[str, str]]) -> str:
+		# Fingerprint content rather than storing it: blake2b keeps the key
+		# short even when sources carry whole lecture transcripts.
+		h = hashlib.blake2b(digest_size=16)
+		h.update(question.strip().lower().encode("utf-8"))
+		for item in sorted(sources, key=lambda s: s.get("source") or ""):
+			h.update((item.get("source") or "").encode("utf-8"))
+			h.update(hashlib.blake2b((item.get("content") or "").encode("utf-8"), digest_size=8).digest())
+		return h.hexdigest()
+
 	def review_and_grade_assignment(
 		self,
 		*,
@@ -453,119 +1035,200 @@ class ChatGPTTaskBreakdownService:
 		Review and grade an assignment draft.
 		Returns feedback, score estimate, strengths, weaknesses, and suggestions.
 		"""
-		system_prompt = (
-			"You are an experienced academic assessor and writing tutor. "
-			"Review student assignments and provide detailed, constructive feedback. "
-			"Identify specific strengths and weaknesses with concrete examples, and offer actionable suggestions. "
-			"Be thorough, specific, and encouraging. Provide detailed feedback that helps students improve their work."
-		)
-
-		user_prompt_lines = [
-			"Review the following assignment submission and provide comprehensive, detailed feedback.",
-			"",
-			f"Assignment Title: {task_title}",
-			"",
-		]
-
-		if assignment_brief:
-			user_prompt_lines.extend([
-				"Assignment Brief / Rubric / Requirements:",
-				assignment_brief,
-				"",
-			])
-
-		user_prompt_lines.extend([
-			"Assignment Content:",
-			assignment_text,
-			"",
-			"Return ONLY JSON in this exact schema:",
-			"{",
-			'  "feedback": str,  // Overall detailed feedback (7-10 sentences, be specific and thorough)',
-			'  "score_estimate": number,  // Estimated score out of 100 (not displayed to user, but used internally)',
-			'  "possible_score": 100,  // Maximum possible score',
-			'  "strengths": [str, ...],  // List of 5-7 detailed strengths with specific examples',
-			'  "weaknesses": [str, ...],  // List of 5-7 detailed areas for improvement with specific examples',
-			'  "suggestions": [str, ...]  // List of 5-7 detailed, actionable suggestions',
-			"}",
-		])
-
-		user_prompt = "\n".join(user_prompt_lines)
+		system_prompt = _SYSTEM_PROMPT_REVIEW
+		user_prompt = self._build_review_prompt(task_title, assignment_text, assignment_brief)
 
 		try:
-			response = self._client.responses.create(
-				model=self._model_name,
-				input=[
-					{"role": "system", "content": system_prompt},
-					{"role": "user", "content": user_prompt},
-				],
+			response = self._create_response(
+				system_prompt=system_prompt,
+				user_prompt=user_prompt,
 				temperature=0.3,
-				max_output_tokens=3000,
+				max_output_tokens=self._review_max_tokens(assignment_text),
 			)
 
-			text = self._extract_text(response)
-			payload = self._parse_json(text)
+			return self._review_from_text(self._extract_text(response))
+		except Exception as exc:
+			raise ChatGPTClientError(f"Failed to review assignment: {exc}") from exc
 
-			feedback = self._safe_str(payload.get("feedback")) or "No feedback provided."
-			score_est = payload.get("score_estimate")
-			if isinstance(score_est, (int, float)):
+	def _build_review_prompt(self, task_title: str, assignment_text: str,
+	                         assignment_brief: Optional[str]) -> str:
+		brief_block = (
+			f"Assignment Brief / Rubric / Requirements:\n{assignment_brief}\n\n"
+			if assignment_brief else ""
+		)
+		return _REVIEW_TEMPLATE.format(
+			task_title=task_title,
+			brief_block=brief_block,
+			assignment_text=assignment_text,
+		)
+
+	def _review_max_tokens(self, assignment_text: str) -> int:
+		# Feedback length tracks submission length; short drafts do not
+		# need the full 3000-token ceiling reserved for them.
+		return min(3000, 1500 + len(assignment_text) // 8)
+
+	def _review_from_text(self, text: str) -> AssignmentReviewResponse:
+		payload = self._parse_json(text)
+
+		feedback = self._safe_str(payload.get("feedback")) or "No feedback provided."
+		score_est = payload.get("score_estimate")
+		if isinstance(score_est, (int, float)):
+			score_est = float(score_est)
+		elif isinstance(score_est, str):
+			try:
 				score_est = float(score_est)
-			elif isinstance(score_est, str):
-				try:
-					score_est = float(score_est)
-				except ValueError:
-					score_est = None
-			else:
+			except ValueError:
 				score_est = None
+		else:
+			score_est = None
 
-			possible = payload.get("possible_score") or 100.0
-			if isinstance(possible, (int, float)):
-				possible = float(possible)
+		possible = payload.get("possible_score") or 100.0
+		if isinstance(possible, (int, float)):
+			possible = float(possible)
+		else:
+			possible = 100.0
+
+		ss = _safe_str
+		strengths = [v for s in payload.get("strengths", []) if (v := ss(s))]
+		weaknesses = [v for w in payload.get("weaknesses", []) if (v := ss(w))]
+		suggestions = [v for s in payload.get("suggestions", []) if (v := ss(s))]
+
+		# Reference: ChatGPT (OpenAI) - Score Calibration Without Flat Clustering
+		# Date: 2026-03-01
+		# Prompt: "My assignment scores are too high, but a fixed deduction by weakness/
+		# suggestion count makes many reviews land on the same exact mark (e.g., 65%).
+		# Can you suggest a conservative calibration that still preserves score spread?"
+		# ChatGPT provided the non-linear calibration + bounded critique deduction
+		# pattern below to keep scores conservative without collapsing to one value.
+		if isinstance(score_est, (int, float)):
+			raw_score = max(0.0, min(100.0, float(score_est)))
+
+			# Compress high-end scores toward the 70 band while preserving ordering.
+			if raw_score >= 70.0:
+				compressed = 70.0 + ((raw_score - 70.0) * 0.68)
+			elif raw_score >= 50.0:
+				compressed = 50.0 + ((raw_score - 50.0) * 0.9)
 			else:
-				possible = 100.0
-
-			strengths = [self._safe_str(s) for s in payload.get("strengths", []) if self._safe_str(s)]
-			weaknesses = [self._safe_str(w) for w in payload.get("weaknesses", []) if self._safe_str(w)]
-			suggestions = [self._safe_str(s) for s in payload.get("suggestions", []) if self._safe_str(s)]
-
-			# Reference: ChatGPT (OpenAI) - Score Calibration Without Flat Clustering
-			# Date: 2026-03-01
-			# Prompt: "My assignment scores are too high, but a fixed deduction by weakness/
-			# suggestion count makes many reviews land on the same exact mark (e.g., 65%).
-			# Can you suggest a conservative calibration that still preserves score spread?"
-			# ChatGPT provided the non-linear calibration + bounded critique deduction
-			# pattern below to keep scores conservative without collapsing to one value.
-			if isinstance(score_est, (int, float)):
-				raw_score = max(0.0, min(100.0, float(score_est)))
-
-				# Compress high-end scores toward the 70 band while preserving ordering.
-				if raw_score >= 70.0:
-					compressed = 70.0 + ((raw_score - 70.0) * 0.68)
-				elif raw_score >= 50.0:
-					compressed = 50.0 + ((raw_score - 50.0) * 0.9)
-				else:
-					compressed = raw_score
-
-				# Keep critique impact, but bounded so long bullet lists don't force identical marks.
-				critique_penalty = min(
-					9.0,
-					(len(weaknesses) * 0.65) + (len(suggestions) * 0.25),
-				)
-				if weaknesses:
-					critique_penalty += 1.0
-
-				score_est = round(max(0.0, min(100.0, compressed - critique_penalty)), 1)
-
-			return AssignmentReviewResponse(
-				feedback=feedback,
-				score_estimate=score_est,
-				possible_score=possible,
-				strengths=strengths,
-				weaknesses=weaknesses,
-				suggestions=suggestions,
-				raw_text=text
+				compressed = raw_score
+
+			# Keep critique impact, but bounded so long bullet lists don't force identical marks.
+			critique_penalty = min(
+				9.0,
+				(len(weaknesses) * 0.65) + (len(suggestions) * 0.25),
 			)
+			if weaknesses:
+				critique_penalty += 1.0
+
+			score_est = round(max(0.0, min(100.0, compressed - critique_penalty)), 1)
+
+		return AssignmentReviewResponse(
+			feedback=feedback,
+			score_estimate=score_est,
+			possible_score=possible,
+			strengths=strengths,
+			weaknesses=weaknesses,
+			suggestions=suggestions,
+			raw_text=text
+		)
+
+	def submit_review_batch(self, assignments: List[Dict[str, Any]]) -> str:
+		"""Submit a class's submissions for offline review via the Batch API.
+
+		Each item needs "assignment_text" and "task_title" (plus optional
+		"assignment_brief" and an "id" used as the custom_id). The batch
+		runs on OpenAI's asynchronous lane at half the per-token cost and
+		without consuming the interactive rate limit; poll with
+		fetch_review_batch. Returns the batch id.
+		"""
+		if not assignments:
+			raise ChatGPTClientError("No assignments to review.")
+
+		lines = []
+		for index, item in enumerate(assignments, start=1):
+			assignment_text = item.get("assignment_text") or ""
+			user_prompt = self._build_review_prompt(
+				item.get("task_title") or f"Assignment {index}",
+				assignment_text,
+				item.get("assignment_brief"),
+			)
+			body = {
+				"model": self._model_name,
+				"input": [
+					{"role": "system", "content": _SYSTEM_PROMPT_REVIEW},
+					{"role": "user", "content": user_prompt},
+				],
+				"temperature": 0.3,
+				"max_output_tokens": self._review_max_tokens(assignment_text),
+			}
+			lines.append(_json_dumps({
+				"custom_id": str(item.get("id") or index),
+				"method": "POST",
+				"url": "/v1/responses",
+				"body": body,
+			}))
+
+		try:
+			buffer = io.BytesIO("\n".join(lines).encode("utf-8"))
+			buffer.name = "review_batch.jsonl"
+			uploaded = self._client.files.create(file=buffer, purpose="batch")
+			batch = self._client.batches.create(
+				input_file_id=uploaded.id,
+				endpoint="/v1/responses",
+				completion_window="24h",
+			)
+			return batch.id
 		except Exception as exc:
-			raise ChatGPTClientError(f"Failed to review assignment: {exc}") from exc
+			raise ChatGPTClientError(f"Failed to submit review batch: {exc}") from exc
+
+	def fetch_review_batch(self, batch_id: str) -> Optional[Dict[str, AssignmentReviewResponse]]:
+		"""Collect a finished review batch as {custom_id: review}.
+
+		Returns None while the batch is still in flight; raises if it
+		failed, expired, or was cancelled.
+		"""
+		try:
+			batch = self._client.batches.retrieve(batch_id)
+			status = getattr(batch, "status", None)
+			if status in ("failed", "expired", "cancelled"):
+				raise ChatGPTClientError(f"Review batch {batch_id} ended with status {status}.")
+			if status != "completed":
+				return None
+			output = self._client.files.content(batch.output_file_id)
+			raw = output.text if hasattr(output, "text") else output.read().decode("utf-8")
+		except ChatGPTClientError:
+			raise
+		except Exception as exc:
+			raise ChatGPTClientError(f"Failed to fetch review batch: {exc}") from exc
+
+		results: Dict[str, AssignmentReviewResponse] = {}
+		for line in raw.splitlines():
+			line = line.strip()
+			if not line:
+				continue
+			try:
+				record = _json_loads(line)
+			except ValueError:
+				continue
+			body = (record.get("response") or {}).get("body") or {}
+			text = self._text_from_response_dict(body)
+			if not text:
+				continue
+			try:
+				results[record.get("custom_id")] = self._review_from_text(text)
+			except ChatGPTClientError:
+				# One bad line should not sink the rest of the class
+				continue
+		return results
+
+	def _text_from_response_dict(self, body: Dict[str, Any]) -> Optional[str]:
+		# Batch output lines carry the response as plain dicts, so the
+		# attribute-walking _extract_text does not apply here.
+		for segment in body.get("output") or []:
+			for part in segment.get("content") or []:
+				text = part.get("text")
+				if text:
+					return text.strip()
+		return None
 
 	def draft_lecturer_email(
 		self,
@@ -585,10 +1248,7 @@ class ChatGPTTaskBreakdownService:
 		if not subject or not request_text:
 			raise ChatGPTClientError("Subject and request details are required.")
 		lecturer_label = lecturer_name or "Lecturer"
-		system_prompt = (
-			"You are a professional academic writing assistant. "
-			"Draft clear, polite emails to lecturers. Keep them concise and respectful."
-		)
+		system_prompt = _SYSTEM_PROMPT_EMAIL
 		user_prompt = (
 			f"Write a professional email to {lecturer_label}.\n"
 			f"Subject: {subject}\n"
@@ -601,12 +1261,9 @@ class ChatGPTTaskBreakdownService:
 			"- Output plain text only."
 		)
 		try:
-			response = self._client.responses.create(
-				model=self._model_name,
-				input=[
-					{"role": "system", "content": system_prompt},
-					{"role": "user", "content": user_prompt},
-				],
+			response = self._create_response(
+				system_prompt=system_prompt,
+				user_prompt=user_prompt,
 				temperature=0.3,
 				max_output_tokens=600,
 			)
@@ -627,66 +1284,21 @@ class ChatGPTTaskBreakdownService:
 		additional_context: Optional[str],
 		schedule_context: Optional[str],
 	) -> (str, str):
-		system_prompt = (
-			"You are an experienced academic coach and study strategist. "
-			"Produce realistic schedules that respect the student's existing commitments. "
-			"Break down assignments into granular, actionable micro-tasks with detailed step-by-step guidance and practical ideas. "
-			"Each micro-task should be comprehensive enough that a student knows exactly what to do, why they're doing it, and has specific ideas to get started."
+		# Today's date is part of the cache key, so "regenerate" clicks with
+		# identical inputs reuse the assembled prompt and the key naturally
+		# rolls over at midnight.
+		return _SYSTEM_PROMPT_BREAKDOWN, _build_breakdown_user_prompt(
+			date.today().isoformat(),
+			task_title,
+			module_code,
+			due_date,
+			due_at,
+			status,
+			description,
+			additional_context,
+			schedule_context,
 		)
 
-		from datetime import datetime as _dt
-		today_str = _dt.now().strftime("%Y-%m-%d")
-
-		lines = [
-			f"Today's date is {today_str}. All planned dates MUST be today or later — never in the past.",
-			"Break the assignment into 8-12 practical micro-tasks ordered by sequence.",
-			"Each micro-task should be focused and achievable in 1-3 hours (prefer shorter, more frequent tasks over long sessions).",
-			"Spread tasks evenly across the available days until the due date — do NOT cluster them on consecutive days when the deadline is far away.",
-			"Each micro-task must include:",
-			"  - A detailed description (3-5 sentences) with specific actionable steps explaining what to do and how to approach it",
-			"  - Concrete ideas and suggestions for completing the task (specific resources, methods, or approaches)",
-			"  - A recommended focus tip or strategy",
-			"  - Estimated hours (aim for 1-3 hours per task, with most tasks around 1.5-2 hours)",
-			"  - A suggested start/end window (use plain language such as '2026-03-10 evening' — always include morning, afternoon, or evening)",
-			"Make descriptions comprehensive enough that a student knows exactly what to do, why they're doing it, and has practical ideas to get started.",
-			"Include specific examples, resources to consult, or methods to use in the descriptions.",
-			"Respect the student's existing assignments and events when proposing dates—avoid overlaps.",
-			"Return ONLY JSON in this exact schema:",
-			"{",
-			'  "subtasks": [',
-			'    { "sequence": int, "title": str, "description": str, "estimated_hours": number, '
-			'"planned_start": str, "planned_end": str, "focus": str }',
-			"  ],",
-			'  "advice": str  // include a mini study strategy summary (3-4 sentences)',
-			"}",
-			f"Task title: {task_title}",
-		]
-
-		if module_code:
-			lines.append(f"Module: {module_code}")
-		if status:
-			lines.append(f"Current status: {status}")
-		if due_date:
-			lines.append(f"Due date: {due_date}")
-		if due_at:
-			lines.append(f"Due at: {due_at}")
-		if description:
-			lines.append(f"Assignment brief: {description}")
-		if additional_context:
-			lines.append(f"Additional context: {additional_context}")
-		if schedule_context:
-			lines.append("")
-			lines.append("Student schedule snapshot:")
-			lines.append(schedule_context)
-
-		lines.append("")
-		lines.append(
-			"Ensure the JSON parses in Python. Use concise ISO-like text for planned_start/planned_end (e.g. '2025-11-14 evening'). "
-			"Each description should be 3-5 sentences with actionable steps, specific ideas, resources, or methods. "
-			"Aim for 8-12 subtasks total, each taking 1-3 hours."
-		)
-		return system_prompt, "\n".join(lines)
-
 	# Reference: ChatGPT (OpenAI) - OpenAI Response Text Extraction
 	# Date: 2025-11-14
 	# Prompt: "The OpenAI Responses API returns nested response objects. I need to extract 
@@ -738,27 +1350,29 @@ class ChatGPTTaskBreakdownService:
 			payload = self._strip_fence(payload)
 
 		try:
-			return json.loads(payload)
-		except json.JSONDecodeError:
+			return _json_loads(payload)
+		except ValueError:
 			fragment = self._extract_json_fragment(payload)
-			if fragment:
+			# Skip the second parse when the fragment is the whole payload;
+			# it would just fail the same way again.
+			if fragment and fragment != payload:
 				try:
-					return json.loads(fragment)
-				except json.JSONDecodeError:
+					return _json_loads(fragment)
+				except ValueError:
 					pass
 		raise ChatGPTClientError("OpenAI response was not valid JSON.")
 
 	def _normalise_items(self, subtasks: List[Dict[str, Any]]) -> List[BreakdownItem]:
+		# Local alias: one LOAD_FAST per field instead of a bound-method
+		# dispatch, and every field is converted exactly once.
+		ss = _safe_str
 		items: List[BreakdownItem] = []
 		for index, row in enumerate(subtasks, start=1):
-			title = self._safe_str(row.get("title")) or f"Step {index}"
-			description = (
-				self._safe_str(row.get("description"))
-				or self._safe_str(row.get("details"))
-				or ""
-			)
-			sequence = row.get("sequence") or index
-			estimated = row.get("estimated_hours")
+			g = row.get
+			title = ss(g("title")) or f"Step {index}"
+			description = ss(g("description")) or ss(g("details")) or ""
+			sequence = g("sequence") or index
+			estimated = g("estimated_hours")
 			if isinstance(estimated, str):
 				try:
 					estimated = float(estimated)
@@ -775,9 +1389,9 @@ class ChatGPTTaskBreakdownService:
 					title=title,
 					description=description,
 					estimated_hours=estimated,
-					planned_start=self._safe_str(row.get("planned_start") or row.get("start")),
-					planned_end=self._safe_str(row.get("planned_end") or row.get("end")),
-					focus=self._safe_str(row.get("focus") or row.get("tip")),
+					planned_start=ss(g("planned_start") or g("start")),
+					planned_end=ss(g("planned_end") or g("end")),
+					focus=ss(g("focus") or g("tip")),
 				)
 			)
 		return items
@@ -792,10 +1406,33 @@ class ChatGPTTaskBreakdownService:
 	# OpenAI returns JSON embedded in explanatory text.
 	def _extract_json_fragment(self, text: str) -> Optional[str]:
 		start = text.find("{")
-		end = text.rfind("}")
-		if start == -1 or end == -1 or end <= start:
+		if start == -1:
 			return None
-		return text[start:end + 1]
+		# Walk from the first '{' tracking brace depth (skipping braces
+		# inside strings), so trailing prose with a stray '}' after the
+		# object no longer breaks the fallback parse.
+		depth = 0
+		in_string = False
+		escape = False
+		for i in range(start, len(text)):
+			ch = text[i]
+			if in_string:
+				if escape:
+					escape = False
+				elif ch == "\\":
+					escape = True
+				elif ch == '"':
+					in_string = False
+				continue
+			if ch == '"':
+				in_string = True
+			elif ch == "{":
+				depth += 1
+			elif ch == "}":
+				depth -= 1
+				if depth == 0:
+					return text[start:i + 1]
+		return None
 
 	def _strip_fence(self, text: str) -> str:
 		lines = text.splitlines()
@@ -806,30 +1443,18 @@ class ChatGPTTaskBreakdownService:
 		return "\n".join(lines).strip()
 
 	def _safe_str(self, value: Any) -> Optional[str]:
-		if value is None:
-			return None
-		try:
-			return str(value).strip()
-		except Exception:
-			return None
+		return _safe_str(value)
 
 	def _clean_markdown(self, text: str) -> str:
 		if not text:
 			return ""
-		lines = []
-		for line in text.splitlines():
-			trimmed = line.strip()
-			if not trimmed:
-				continue
-			# Remove markdown headers and bullets
-			while trimmed.startswith("#"):
-				trimmed = trimmed[1:].strip()
-			if trimmed.startswith(("-", "*", "•")):
-				trimmed = trimmed[1:].strip()
-			# Remove bold/italic markers
-			trimmed = trimmed.replace("**", "").replace("__", "").replace("*", "").replace("_", "")
-			lines.append(trimmed)
-		return "\n".join(lines).strip()
+		if _MD_ANY.search(text) is not None:
+			text = _MD_HEADERS.sub("", text)
+			text = _MD_BULLETS.sub("", text)
+			text = _MD_EMPH.sub("", text)
+		return "\n".join(
+			stripped for line in text.splitlines() if (stripped := line.strip())
+		)
 
 	def get_study_recommendations(
 		self,
@@ -844,54 +1469,276 @@ class ChatGPTTaskBreakdownService:
 		# steps without markdown. Can you craft a prompt for that?"
 		# ChatGPT provided the prompt structure and output constraints.
 		"""Generate AI-based study recommendations for planning and prioritization."""
-		system_prompt = (
-			"You are an experienced academic coach and study strategist. "
-			"Provide personalized, actionable study recommendations based on the student's current workload, progress, and schedule. "
-			"Focus on practical advice for task prioritization, time management, and study strategies. "
-			"Be encouraging and specific in your recommendations."
+		user_prompt = self._build_recommendations_prompt(
+			tasks_summary, progress_summary, schedule_summary
 		)
-
-		user_prompt_lines = [
-			"Analyze the student's current situation and provide personalized study recommendations.",
-			"Focus on:",
-			"  - Task prioritization (which assignments to tackle first)",
-			"  - Time management strategies",
-			"  - Study techniques and approaches",
-			"  - Ways to improve productivity",
-			"",
-			"Return your recommendations as clear, well-structured text (not JSON).",
-			"Do NOT use markdown headings, hashtags, or bold/italic markers.",
-			"Use a numbered list (1., 2., 3., etc.) for easy reading.",
-			"Write 6-8 recommendations, each 2-3 sentences long and specific.",
-			"",
-			"Student's current tasks and workload:",
-			tasks_summary,
-			"",
-			"Progress overview:",
-			progress_summary,
-		]
-
-		if schedule_summary:
-			user_prompt_lines.extend([
-				"",
-				"Schedule context:",
-				schedule_summary
-			])
-
-		user_prompt = "\n".join(user_prompt_lines)
+		cache_key = self._recs_cache_key(user_prompt)
+		hit = self._recs_cache.get(cache_key)
+		if hit is not None:
+			return hit
+
+		# Singleflight: if another thread is already generating this exact
+		# prompt (cohort defaults, double-clicked refresh), wait for its
+		# answer to land in the cache rather than spending a second call.
+		with self._recs_in_flight_lock:
+			done = self._recs_in_flight.get(cache_key)
+			leader = done is None
+			if leader:
+				done = threading.Event()
+				self._recs_in_flight[cache_key] = done
+		if not leader:
+			done.wait(timeout=120.0)
+			hit = self._recs_cache.get(cache_key)
+			if hit is not None:
+				return hit
+			# The leader failed or timed out; fall through and try directly.
 
 		try:
-			response = self._client.responses.create(
-				model=self._model_name,
-				input=[
-					{"role": "system", "content": system_prompt},
-					{"role": "user", "content": user_prompt},
-				],
+			response = self._create_response(
+				system_prompt=_SYSTEM_PROMPT_RECOMMENDATIONS,
+				user_prompt=user_prompt,
 				temperature=0.6,  # Slightly higher for more varied recommendations
 				max_output_tokens=1500,
 			)
 
-			text = self._extract_text(response)
-			return self._clean_markdown(text)
+			text = self._clean_markdown(self._extract_text(response))
+			self._recs_cache.set(cache_key, text)
+			return text
 		except Exception as exc:
 			raise ChatGPTClientError(f"Failed to generate study recommendations: {exc}") from exc
+		finally:
+			if leader:
+				with self._recs_in_flight_lock:
+					self._recs_in_flight.pop(cache_key, None)
+				done.set()
+
+	def stream_study_recommendations(
+		self,
+		*,
+		tasks_summary: str,
+		progress_summary: str,
+		schedule_summary: Optional[str] = None
+	):
+		"""Stream recommendations, yielding cleaned lines as they finish.
+
+		Buffered generation makes the user wait for all 1500 tokens; here
+		the first numbered recommendation appears as soon as its line
+		completes. Markdown cleaning runs per complete line, with the
+		partial tail held back until its newline (or end of stream)
+		arrives. The full cleaned text is cached afterwards so the next
+		non-streaming call is free.
+		"""
+		user_prompt = self._build_recommendations_prompt(
+			tasks_summary, progress_summary, schedule_summary
+		)
+		cache_key = self._recs_cache_key(user_prompt)
+		hit = self._recs_cache.get(cache_key)
+		if hit is not None:
+			yield from (line + "\n" for line in hit.splitlines())
+			return
+
+		stream_api = getattr(self._client.responses, "stream", None)
+		if stream_api is None:
+			yield self.get_study_recommendations(
+				tasks_summary=tasks_summary,
+				progress_summary=progress_summary,
+				schedule_summary=schedule_summary,
+			)
+			return
+
+		self._rate_limiter.acquire(
+			self._estimate_tokens(_SYSTEM_PROMPT_RECOMMENDATIONS, user_prompt, 1500)
+		)
+		tail = ""
+		emitted: List[str] = []
+		for attempt in range(1, _MAX_API_ATTEMPTS + 1):
+			try:
+				with stream_api(
+					model=self._model_name,
+					input=[
+						{"role": "system", "content": _SYSTEM_PROMPT_RECOMMENDATIONS},
+						{"role": "user", "content": user_prompt},
+					],
+					temperature=0.6,
+					max_output_tokens=1500,
+				) as stream:
+					for event in stream:
+						etype = getattr(event, "type", "")
+						if etype == "response.completed":
+							# Keep the chars-per-token EMA fed on the
+							# streaming path too
+							self._observe_usage(
+								getattr(event, "response", None),
+								len(_SYSTEM_PROMPT_RECOMMENDATIONS) + len(user_prompt),
+							)
+							continue
+						if etype != "response.output_text.delta":
+							continue
+						tail += event.delta
+						while "\n" in tail:
+							line, tail = tail.split("\n", 1)
+							cleaned = self._clean_markdown(line)
+							if cleaned:
+								emitted.append(cleaned)
+								yield cleaned + "\n"
+				break
+			except _RETRYABLE_ERRORS:
+				# Same rule as the breakdown stream: a restart is only safe
+				# before the first line has been yielded.
+				if emitted or attempt == _MAX_API_ATTEMPTS:
+					raise
+				tail = ""
+				time.sleep(_retry_wait(attempt))
+		cleaned = self._clean_markdown(tail)
+		if cleaned:
+			emitted.append(cleaned)
+			yield cleaned + "\n"
+		if emitted:
+			self._recs_cache.set(cache_key, "\n".join(emitted))
+
+	def get_study_recommendations_batch(self, students: List[Dict[str, Any]]) -> Dict[str, str]:
+		"""Generate recommendations for up to ~10 students in one request.
+
+		Nightly regeneration pays the network round-trip and the shared
+		system prompt once for the whole group instead of once per
+		student. Each student dict needs "id", "tasks_summary" and
+		"progress_summary" (optional "schedule_summary"). Returns
+		{student_id: recommendations_text}; students the model skipped
+		are simply absent. Keep groups to roughly 5-10 students so the
+		output stays inside the token budget.
+		"""
+		if not students:
+			return {}
+
+		payload = _json_dumps([
+			{
+				"id": str(student.get("id")),
+				"tasks": student.get("tasks_summary") or "",
+				"progress": student.get("progress_summary") or "",
+				"schedule": student.get("schedule_summary") or "",
+			}
+			for student in students
+		])
+		user_prompt = _RECS_BATCH_TEMPLATE.format(students=payload)
+
+		try:
+			response = self._create_response(
+				system_prompt=_SYSTEM_PROMPT_RECOMMENDATIONS,
+				user_prompt=user_prompt,
+				temperature=0.6,
+				max_output_tokens=min(4000, 600 * len(students)),
+			)
+
+			parsed = self._parse_json(self._extract_text(response))
+			results: Dict[str, str] = {}
+			for student in students:
+				student_id = str(student.get("id"))
+				text = self._safe_str(parsed.get(student_id))
+				if text:
+					results[student_id] = self._clean_markdown(text)
+			return results
+		except Exception as exc:
+			raise ChatGPTClientError(f"Failed to generate batch study recommendations: {exc}") from exc
+
+	def _recs_cache_key(self, user_prompt: str) -> str:
+		return hashlib.sha256(
+			(_SYSTEM_PROMPT_RECOMMENDATIONS + user_prompt).encode("utf-8")
+		).hexdigest()
+
+	def _truncate_summary(self, text: str) -> str:
+		"""Trim a summary to roughly _SUMMARY_TOKEN_BUDGET input tokens.
+
+		Callers build summaries highest-priority-first, so whole lines are
+		kept from the top until the budget runs out and a marker records
+		how many older items were dropped. The chars-per-token EMA converts
+		the token budget to a character budget, so no tokenizer dependency
+		is needed.
+		"""
+		budget = int(_SUMMARY_TOKEN_BUDGET * max(1.0, self._cpt_mean - self._cpt_dev))
+		if len(text) <= budget:
+			return text
+		lines = text.split("\n")
+		kept: List[str] = []
+		used = 0
+		for index, line in enumerate(lines):
+			cost = len(line) + 1
+			if used + cost > budget:
+				if not kept:
+					# A single oversized line still has to fit the budget
+					kept.append(line[:budget])
+					index += 1
+				kept.append(f"... ({len(lines) - index} more older items truncated)")
+				break
+			kept.append(line)
+			used += cost
+		return "\n".join(kept)
+
+	def _build_recommendations_prompt(self, tasks_summary: str, progress_summary: str,
+	                                  schedule_summary: Optional[str]) -> str:
+		# Cap the history-derived blocks so prefill cost stays flat as a
+		# student's record grows; every recommendations path funnels
+		# through here, and the cache key is taken after truncation.
+		tasks_summary = self._truncate_summary(tasks_summary)
+		progress_summary = self._truncate_summary(progress_summary)
+		schedule_block = (
+			f"\n\nSchedule context:\n{schedule_summary}" if schedule_summary else ""
+		)
+		return _RECS_TEMPLATE.format(
+			tasks_summary=tasks_summary,
+			progress_summary=progress_summary,
+			schedule_block=schedule_block,
+		)
+
+	async def _get_study_recommendations_async(self, client, **summary_fields: Any) -> str:
+		user_prompt = self._build_recommendations_prompt(
+			summary_fields.get("tasks_summary") or "",
+			summary_fields.get("progress_summary") or "",
+			summary_fields.get("schedule_summary"),
+		)
+		cache_key = self._recs_cache_key(user_prompt)
+		hit = self._recs_cache.get(cache_key)
+		if hit is not None:
+			return hit
+		estimated = self._estimate_tokens(_SYSTEM_PROMPT_RECOMMENDATIONS, user_prompt, 1500)
+		while (wait := self._rate_limiter.try_acquire(estimated)) > 0.0:
+			await asyncio.sleep(wait)
+		for attempt in range(1, _MAX_API_ATTEMPTS + 1):
+			try:
+				response = await client.responses.create(
+					model=self._model_name,
+					input=[
+						{"role": "system", "content": _SYSTEM_PROMPT_RECOMMENDATIONS},
+						{"role": "user", "content": user_prompt},
+					],
+					temperature=0.6,
+					max_output_tokens=1500,
+				)
+				break
+			except _RETRYABLE_ERRORS:
+				if attempt == _MAX_API_ATTEMPTS:
+					raise
+				await asyncio.sleep(_retry_wait(attempt))
+		self._observe_usage(response, len(_SYSTEM_PROMPT_RECOMMENDATIONS) + len(user_prompt))
+		text = self._clean_markdown(self._extract_text(response))
+		self._recs_cache.set(cache_key, text)
+		return text
+
+	def get_study_recommendations_bulk(self, items: List[Dict[str, Any]]) -> List[str]:
+		"""Generate recommendations for several students concurrently.
+
+		Each item is the keyword dict get_study_recommendations accepts.
+		Like breakdown_tasks_bulk, the per-student calls are pure HTTP
+		latency, so overlapping them with asyncio.gather finishes in
+		roughly the slowest single call; the rate limiter paces dispatch
+		under the account ceiling. Results keep input order.
+		"""
+		if not items:
+			return []
+
+		async def _run() -> List[str]:
+			async with self._async_client_scope() as client:
+				return list(await asyncio.gather(
+					*(self._get_study_recommendations_async(client, **item) for item in items)
+				))
+
+		return asyncio.run(_run())
@@ -1,5 +1,14 @@
 from main import app
 
+# Optional ASGI adapter so the app can also be served by uvicorn/hypercorn
+# (e.g. `uvicorn wsgi:asgi_app`), multiplexing blocking I/O handlers on a
+# thread pool instead of one worker thread per in-flight request.
+try:
+    from asgiref.wsgi import WsgiToAsgi
+    asgi_app = WsgiToAsgi(app)
+except Exception:
+    asgi_app = None
+
 
 if __name__ == "__main__":
     app.run()